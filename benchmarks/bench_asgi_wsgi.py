@@ -0,0 +1,110 @@
+"""
+Throughput and tail latency of a running deployment under high concurrency.
+
+Start each deployment on its own port and point the benchmark at both, e.g.
+
+    gunicorn myapp.wsgi -w 4 --threads 8 -b :8001
+    ASYNC_VIEWS=true uvicorn myapp.asgi:application --workers 4 --port 8002
+
+    python -m benchmarks.bench_asgi_wsgi --path /users/whoami --cookie "sessionid=..." \
+        --target wsgi=http://127.0.0.1:8001 --target asgi=http://127.0.0.1:8002
+
+Each connection is a keep-alive HTTP/1.1 client on asyncio, so the load generator
+itself is not the bottleneck at a few hundred concurrent connections.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.split(b"\r\n")
+    status = int(lines[0].split(b" ", 2)[1])
+    keep_alive = lines[0].startswith(b"HTTP/1.1")
+    length = None
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"connection":
+            keep_alive = value.strip().lower() != b"close"
+    if length is None:
+        # No length, the server closes the connection after the body
+        await reader.read()
+        return status, False
+    await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def worker(host, port, request, deadline, latencies, statuses):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        if writer is None:
+            reader, writer = await asyncio.open_connection(host, port)
+        start = time.perf_counter()
+        writer.write(request)
+        await writer.drain()
+        status, keep_alive = await read_response(reader)
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run(url, path, cookie, concurrency, duration):
+    parts = urlsplit(url)
+    headers = [f"GET {path} HTTP/1.1", f"Host: {parts.netloc}", "Connection: keep-alive"]
+    if cookie:
+        headers.append(f"Cookie: {cookie}")
+    request = ("\r\n".join(headers) + "\r\n\r\n").encode()
+
+    latencies, statuses = [], {}
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(
+        *(
+            worker(parts.hostname, parts.port or 80, request, deadline, latencies, statuses)
+            for _ in range(concurrency)
+        )
+    )
+    return latencies, statuses
+
+
+def percentile(values, pct):
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", action="append", required=True, help="label=http://host:port")
+    parser.add_argument("--path", default="/users/csrf")
+    parser.add_argument("--cookie", default="")
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--duration", type=float, default=15.0)
+    args = parser.parse_args()
+
+    for target in args.target:
+        label, _, url = target.partition("=")
+        latencies, statuses = asyncio.run(
+            run(url, args.path, args.cookie, args.concurrency, args.duration)
+        )
+        if len(latencies) < 2:
+            print(f"{label:>6}: not enough responses")
+            continue
+        print(
+            f"{label:>6}: {len(latencies) / args.duration:9.1f} req/s  "
+            f"p50 {percentile(latencies, 50) * 1000:7.1f} ms  "
+            f"p99 {percentile(latencies, 99) * 1000:7.1f} ms  "
+            f"status {dict(sorted(statuses.items()))}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Per-access cost of PermissionEnum lookups, before and after the memoized table.
+
+    python -m benchmarks.bench_permission_enum
+"""
+
+import timeit
+from types import SimpleNamespace
+
+from myapp.enums.application_role_names import PermissionEnumMeta
+
+NUMBER = 1_000_000
+
+
+class LegacyPermissionEnumMeta(type):
+    # The original implementation, rebuilt on every access
+    def __getattr__(cls, model_name):
+        model_name_lower = model_name.lower()
+        return SimpleNamespace(
+            add=f"add_{model_name_lower}",
+            change=f"change_{model_name_lower}",
+            delete=f"delete_{model_name_lower}",
+            view=f"view_{model_name_lower}",
+        )
+
+
+class LegacyPermissionEnum(metaclass=LegacyPermissionEnumMeta):
+    pass
+
+
+class MemoizedPermissionEnum(metaclass=PermissionEnumMeta):
+    pass
+
+
+class FakeRegistry:
+    """Stands in for django.apps.apps so the benchmark needs no settings"""
+
+    def get_models(self):
+        for name in ("User", "Group", "Permission", "Tenant", "TenantRoleGroup"):
+            yield SimpleNamespace(_meta=SimpleNamespace(object_name=name, model_name=name.lower()))
+
+
+def main():
+    MemoizedPermissionEnum.load(FakeRegistry())
+
+    for label, enum in (("legacy", LegacyPermissionEnum), ("memoized", MemoizedPermissionEnum)):
+        seconds = min(timeit.repeat(lambda: enum.User.view, number=NUMBER, repeat=5))
+        print(f"{label:>9}: {seconds / NUMBER * 1e9:7.1f} ns per PermissionEnum.User.view")
+
+
+if __name__ == "__main__":
+    main()
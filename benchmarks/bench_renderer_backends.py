@@ -0,0 +1,87 @@
+"""
+ApiWrapperRenderer throughput per JSON backend on large FetchAllUsers-shaped payloads.
+
+    python -m benchmarks.bench_renderer_backends --rows 50000
+"""
+
+import argparse
+import datetime
+import decimal
+import time
+import uuid
+
+import django
+from django.conf import settings
+
+settings.configure(REST_FRAMEWORK={"UNICODE_JSON": True, "COMPACT_JSON": True})
+django.setup()
+
+from rest_framework.response import Response  # noqa: E402
+
+from myapp.configurations.renderers import JSON_BACKENDS, ApiWrapperRenderer  # noqa: E402
+
+
+def make_payload(rows, raw):
+    """
+    raw=False mirrors ModelSerializer output (datetimes already strings),
+    raw=True keeps datetime, Decimal and UUID objects for the encoder hooks
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    users = []
+    for i in range(rows):
+        user = {
+            "id": i,
+            "username": f"user_{i}",
+            "email": f"user.{i}@example.com",
+            "first_name": "Zoë",
+            "last_name": "Smith",
+            "created_at": now - datetime.timedelta(seconds=i),
+            "updated_at": now,
+        }
+        if raw:
+            user["balance"] = decimal.Decimal("10.50")
+            user["uuid"] = uuid.uuid4()
+        else:
+            user["created_at"] = user["created_at"].isoformat().replace("+00:00", "Z")
+            user["updated_at"] = user["updated_at"].isoformat().replace("+00:00", "Z")
+        users.append(user)
+    return {"message": "Fetched All Users", "data": users}
+
+
+def render(backend, payload):
+    settings.REST_FRAMEWORK["JSON_ENCODER_BACKEND"] = backend
+    context = {"response": Response(status=200)}
+    return ApiWrapperRenderer().render(dict(payload), renderer_context=context)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for raw in (False, True):
+        payload = make_payload(args.rows, raw)
+        baseline = render("stdlib", payload)
+        print("raw values" if raw else "serialized")
+
+        for backend, dumps in JSON_BACKENDS.items():
+            if backend != "stdlib" and dumps is None:
+                print(f"  {backend:>7}: not installed")
+                continue
+
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                body = render(backend, payload)
+                timings.append(time.perf_counter() - start)
+
+            identical = "identical" if body == baseline else "DIFFERENT"
+            print(
+                f"  {backend:>7}: {min(timings) * 1000:8.1f} ms for {args.rows} rows, "
+                f"{len(body) / 1e6:.1f} MB, {identical} to stdlib"
+            )
+
+
+if __name__ == "__main__":
+    main()
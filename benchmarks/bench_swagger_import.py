@@ -0,0 +1,110 @@
+"""
+Import cost of the documented views, with the swagger_response wrappers built lazily (what a worker
+pays at boot) and with one wrapper class per endpoint and status code built at import, as the
+decorator used to do.
+
+    python -m benchmarks.bench_swagger_import --runs 10
+
+Every run is a fresh interpreter, so module caches don't hide the cost. Uses DJANGO_SETTINGS_MODULE
+(myapp.settings by default).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, time
+import django
+django.setup()
+
+from rest_framework import serializers
+
+def serializer_classes():
+    seen, stack = set(), [serializers.BaseSerializer]
+    while stack:
+        for cls in stack.pop().__subclasses__():
+            if cls not in seen:
+                seen.add(cls)
+                stack.append(cls)
+    return len(seen)
+
+before = serializer_classes()
+start = time.perf_counter()
+import myapp.views, users.views
+imported = time.perf_counter() - start
+lazy_classes = serializer_classes() - before
+
+from myapp.configurations.yasg_wrapper import LazyResponses, make_response_serializer
+
+handlers = [
+    handler
+    for module in (myapp.views, users.views)
+    for view in vars(module).values() if isinstance(view, type)
+    for handler in vars(view).values()
+    if isinstance(getattr(handler, "_swagger_auto_schema", {}).get("lazy_responses"), LazyResponses)
+]
+
+# The original decorator, a wrapper class per endpoint and status code
+legacy_before = serializer_classes()
+start = time.perf_counter()
+for handler in handlers:
+    for code, data, desc, message, example in handler._swagger_auto_schema["lazy_responses"].specs:
+        make_response_serializer(
+            data,
+            ref_name=f"Legacy{handler.__qualname__}{code}Response",
+            status_example="Error" if code >= 400 else "Success",
+            status_code_example=code,
+            message_example=message,
+        )
+legacy = time.perf_counter() - start
+legacy_classes = serializer_classes() - legacy_before
+
+shared_before = serializer_classes()
+start = time.perf_counter()
+for handler in handlers:
+    handler._swagger_auto_schema["lazy_responses"].build()
+shared = time.perf_counter() - start
+
+print(json.dumps({
+    "import_ms": imported * 1000,
+    "legacy_ms": legacy * 1000,
+    "shared_ms": shared * 1000,
+    "import_classes": lazy_classes,
+    "legacy_classes": legacy_classes,
+    "shared_classes": serializer_classes() - shared_before,
+}))
+"""
+
+
+def probe():
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "myapp.settings")}
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [probe() for _ in range(args.runs)]
+    imported = statistics.median(run["import_ms"] for run in runs)
+    legacy = statistics.median(run["legacy_ms"] for run in runs)
+    shared = statistics.median(run["shared_ms"] for run in runs)
+    first = runs[0]
+
+    print(f"median of {args.runs} runs")
+    print(f"{'':<30}{'ms':>10}{'new classes':>14}")
+    print(f"{'import, lazy wrappers':<30}{imported:>10.2f}{first['import_classes']:>14}")
+    print(f"{'import, eager per-endpoint':<30}{imported + legacy:>10.2f}{first['import_classes'] + first['legacy_classes']:>14}")
+    print(f"{'first schema generation':<30}{shared:>10.2f}{first['shared_classes']:>14}")
+
+
+if __name__ == "__main__":
+    main()
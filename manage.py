@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+    # The suite runs with the test settings (query budgets enforced) unless told otherwise
+    default_settings = "myapp.test_settings" if sys.argv[1:2] == ["test"] else "myapp.settings"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", default_settings)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -0,0 +1,69 @@
+from inspect import isawaitable
+
+from rest_framework.views import APIView
+
+from myapp.configurations.throttling import allow_request_async
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines, served without thread hops under ASGI.
+
+    It runs the same initial / handle_exception / finalize_response hooks as
+    APIView.dispatch, so ApiWrapperRenderer, global_exception_handler and mixins
+    such as ConditionalGetMixin behave exactly as in the sync views.
+    - The session user is resolved with `await request.auser()` before DRF
+      authentication, so SessionAuthentication never touches the database
+    - Throttles with an `aallow_request` (the token buckets) are awaited, so their
+      cache round trips don't block the loop; others still run inline
+    - Permission classes still run inline on the event loop and must not query
+      the database (IsSuperAdmin and a warm HasPermission don't)
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+        if hasattr(request, "auser"):
+            request.user = await request.auser()
+
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            self.initial(request, *args, **kwargs)
+            await self.acheck_throttles(request)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            # http_method_not_allowed and options stay synchronous
+            if isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    def check_throttles(self, request):
+        # Called by initial(), the throttles run in acheck_throttles right after it
+        pass
+
+    async def acheck_throttles(self, request):
+        """
+        APIView.check_throttles, awaiting the throttles that support it
+        """
+        throttle_durations = []
+        for throttle in self.get_throttles():
+            if not await allow_request_async(throttle, request, self):
+                throttle_durations.append(throttle.wait())
+
+        if throttle_durations:
+            durations = [duration for duration in throttle_durations if duration is not None]
+            self.throttled(request, max(durations, default=None))
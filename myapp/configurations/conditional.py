@@ -0,0 +1,120 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+SAFE_METHODS = ("GET", "HEAD")
+
+
+class NotModified(Exception):
+    """
+    Raised to short-circuit a view with a 304/412, handled by ConditionalGetMixin
+    """
+
+    def __init__(self, response):
+        self.response = response
+
+
+def make_etag(*parts):
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(digest)
+
+
+def queryset_etag(queryset, *extra):
+    """
+    ETag from max(updated_at) and the row count, one aggregate query.
+    Only meant for bounded querysets, on a whole large table prefer objects_etag.
+    """
+    stats = queryset.aggregate(last=Max("updated_at"), count=Count("pk"))
+    return make_etag(stats["last"], stats["count"], *extra)
+
+
+def objects_etag(objects, *extra):
+    """
+    ETag from (pk, updated_at) of rows already fetched, e.g. a page, before serializing them
+    """
+    return make_etag(*((obj.pk, obj.updated_at) for obj in objects), *extra)
+
+
+class ConditionalGetMixin:
+    """
+    Opt-in If-None-Match / If-Modified-Since support for APIViews.
+    - get_etag(request) / get_last_modified(request): validators checked before the handler runs
+    - self.check_not_modified(request, etag=..., last_modified=...): the same check from
+      inside a handler, once the cheap validators are known but before serialization
+    - otherwise the ETag falls back to an MD5 of the rendered body, which saves bandwidth only
+    """
+
+    def get_etag(self, request):
+        return None
+
+    def get_last_modified(self, request):
+        return None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._etag = self._last_modified = None
+
+        if request.method in SAFE_METHODS:
+            etag = self.get_etag(request)
+            last_modified = self.get_last_modified(request)
+            if etag or last_modified:
+                self.check_not_modified(request, etag=etag, last_modified=last_modified)
+
+    def check_not_modified(self, request, etag=None, last_modified=None):
+        self._etag = etag
+        self._last_modified = last_modified
+        if request.method not in SAFE_METHODS:
+            return
+
+        response = get_conditional_response(
+            request._request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+        if response is not None:
+            # A 304 carries the validators the 200 would have had (RFC 9110 15.4.5)
+            if response.status_code == 304:
+                if etag:
+                    response.headers["ETag"] = etag
+                if last_modified:
+                    response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        if (
+            request.method not in SAFE_METHODS
+            or response.status_code != 200
+            or isinstance(response, StreamingHttpResponse)
+        ):
+            return response
+
+        etag = getattr(self, "_etag", None)
+        last_modified = getattr(self, "_last_modified", None)
+
+        if etag is None and isinstance(response, Response):
+            content = response.render().content
+            etag = quote_etag(hashlib.md5(content, usedforsecurity=False).hexdigest())
+
+        if etag:
+            response.headers["ETag"] = etag
+        if last_modified:
+            response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+
+        # A client already holding the body gets a 304 built from these headers
+        return get_conditional_response(
+            request._request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+            response=response,
+        )
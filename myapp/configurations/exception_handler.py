@@ -1,9 +1,11 @@
 from django.conf import settings
 from rest_framework.views import exception_handler
 from rest_framework import status
+from rest_framework.exceptions import Throttled
 from myapp.utils.env_constants import env
 from myapp.configurations.logging import logger
 from myapp.utils.responses import error
+from myapp.utils.hashing import HashingPoolBusy
 
 
 def global_exception_handler(exc, context):
@@ -12,6 +14,17 @@ def global_exception_handler(exc, context):
     request = context.get("request")
     view = context.get("view")
 
+    if isinstance(exc, (Throttled, HashingPoolBusy)):
+        # Load shedding is expected under attack, a traceback per rejected request would cost more than the request
+        logger.warning(
+            "Shed %s in %s (Path: %s, retry after %ss)",
+            exc.__class__.__name__,
+            view.__class__.__name__ if view else "UnknownView",
+            request.path if request else "UnknownPath",
+            response.get("Retry-After", "?") if response is not None else "?",
+        )
+        return response
+
     logger.error(
         "Unhandled exception in %s: %s (Path: %s, Method: %s)",
         view.__class__.__name__ if view else "UnknownView",
@@ -1,32 +1,260 @@
+import atexit
+import json
 import os
 import logging
+import queue
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+
+from django.utils.functional import LazyObject, empty
+
+from myapp.utils.env_constants import env
 
 # Logging Configuration
-PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-PROJECT_ROOT = PROJECT_ROOT[:-4]
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 LOGS_DIR = os.path.join(PROJECT_ROOT, "logs")
 os.makedirs(LOGS_DIR, exist_ok=True)
 
 LOG_FILE = os.path.join(LOGS_DIR, "app.log")
+DJANGO_LOG_FILE = os.path.join(LOGS_DIR, "django.log")
+
+
+@lru_cache(maxsize=1024)
+def relative_path(pathname):
+    try:
+        return os.path.relpath(pathname, PROJECT_ROOT)
+    except Exception:
+        return pathname
+
+
+@lru_cache(maxsize=1024)
+def dotted_module(pathname):
+    """
+    "/.../users/views.py" -> "users.views"
+    """
+    return os.path.splitext(relative_path(pathname))[0].replace(os.sep, ".")
 
 
 class RelativePathFilter(logging.Filter):
     def filter(self, record):
-        try:
-            record.relativepath = os.path.relpath(record.pathname, PROJECT_ROOT)
-        except Exception:
-            record.relativepath = record.pathname
+        record.relativepath = relative_path(record.pathname)
         return True
 
 
+@dataclass
+class RequestContext:
+    request_id: str
+    request: object = None
+    view: str | None = None
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def user_id(self):
+        # Never resolve a lazy request.user from logging, that would be a query per log line
+        user = self.request.__dict__.get("user") if self.request is not None else None
+        if isinstance(user, LazyObject):
+            user = None if user._wrapped is empty else user._wrapped
+        return getattr(user, "pk", None)
+
+
+# Set by RequestContextMiddleware, copied into every record created while the request runs
+request_context = ContextVar("request_context", default=None)
+
+_record_factory = logging.getLogRecordFactory()
+
+
+def record_factory(*args, **kwargs):
+    """
+    Stamps request_id / user_id / view / duration_ms on the record in the calling thread,
+    so the values survive the hop to the queue listener.
+    """
+    record = _record_factory(*args, **kwargs)
+    context = request_context.get()
+    if context is None:
+        record.request_id = "-"
+        record.user_id = record.view = record.duration_ms = None
+    else:
+        record.request_id = context.request_id
+        record.user_id = context.user_id
+        record.view = context.view
+        record.duration_ms = round((time.perf_counter() - context.started) * 1000, 2)
+    return record
+
+
+logging.setLogRecordFactory(record_factory)
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line for log shippers
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "path": f"{relative_path(record.pathname)}:{record.lineno}",
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "user_id": getattr(record, "user_id", None),
+            "view": getattr(record, "view", None),
+            "duration_ms": getattr(record, "duration_ms", None),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def parse_sampling(spec):
+    """
+    "users.views=0.1,myapp.configurations=0.5" -> {"users.views": 0.1, "myapp.configurations": 0.5}
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        key, _, rate = item.partition("=")
+        rates[key.strip()] = float(rate)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of the INFO/DEBUG records, warnings and errors always pass.
+    Rates are keyed by logger name or the dotted module of the call site, the longest prefix wins,
+    so "users.views=0.1" thins "Logged in ..." without touching the rest of the myapp logger.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = parse_sampling(rates) if isinstance(rates, str) else dict(rates or {})
+        self.rate_for = lru_cache(maxsize=1024)(self._rate_for)
+
+    def _rate_for(self, name, pathname):
+        best, rate = -1, 1.0
+        for candidate in (name, dotted_module(pathname)):
+            for key, value in self.rates.items():
+                if (candidate == key or candidate.startswith(key + ".")) and len(key) > best:
+                    best, rate = len(key), value
+        return rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self.rate_for(record.name, record.pathname)
+        return rate >= 1.0 or random.random() < rate
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler over a bounded queue, the request thread only enqueues the record.
+    - policy "drop": a full queue drops INFO/DEBUG records and counts them in `dropped`
+    - policy "block": waits up to block_timeout for room, then drops
+    Warnings and errors always wait for room, they are the records worth keeping under load.
+    """
+
+    def __init__(self, queue, policy="drop", block_timeout=1.0):
+        super().__init__(queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            if self.policy == "block" or record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        # logging.shutdown() closes the newest handlers first, so the file handlers are still open here
+        if self.listener is not None:
+            self.listener.stop()
+        super().close()
+
+
+class StartedQueueListener(QueueListener):
+    """
+    The single writer thread of this process, started as soon as dictConfig builds it.
+    Restarted in forked children (gunicorn --preload), where the parent's thread doesn't exist.
+    """
+
+    def __init__(self, queue, *handlers, respect_handler_level=False):
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.start()
+        os.register_at_fork(after_in_child=self._restart)
+        atexit.register(self.stop)
+
+    def _restart(self):
+        self._thread = None
+        self.start()
+
+
+# "rotating" is fine for one process, "watched" lets several workers append to the same file
+# and leaves rotation to logrotate (the handler reopens the file once it is moved)
+FILE_HANDLER_CLASSES = {
+    "rotating": "logging.handlers.RotatingFileHandler",
+    "watched": "logging.handlers.WatchedFileHandler",
+}
+
+
+def file_handler(filename, formatter, level, filters=()):
+    handler = {
+        "class": FILE_HANDLER_CLASSES[env.Logging.file_mode],
+        "filename": filename,
+        "formatter": formatter,
+        "filters": list(filters),
+        "encoding": "utf-8",
+        "level": level,
+    }
+    if env.Logging.file_mode == "rotating":
+        handler.update(maxBytes=10 * 1024 * 1024, backupCount=2)
+    return handler
+
+
+def queued(conf, size, policy):
+    """
+    Route every logger through one BoundedQueueHandler per handler set,
+    the original handlers then run on the listener thread only.
+    """
+    groups = {}
+    for logger_conf in [conf["root"], *conf["loggers"].values()]:
+        names = tuple(logger_conf["handlers"])
+        queue_name = groups.setdefault(names, f"queue_{len(groups)}")
+        logger_conf["handlers"] = [queue_name]
+
+    for names, queue_name in groups.items():
+        conf["handlers"][queue_name] = {
+            "class": "myapp.configurations.logging.BoundedQueueHandler",
+            "handlers": list(names),
+            "queue": {"()": "queue.Queue", "maxsize": size},
+            "listener": "myapp.configurations.logging.StartedQueueListener",
+            "respect_handler_level": True,
+            "policy": policy,
+        }
+    return conf
+
+
 logging_conf = {
     "version": 1,
     "disable_existing_loggers": False,
     "filters": {
         "relative_path": {
             "()": RelativePathFilter,
-        }
+        },
+        "sampling": {
+            "()": SamplingFilter,
+            "rates": env.Logging.sampling,
+        },
     },
     "formatters": {
         "colored": {
@@ -67,15 +295,18 @@ logging_conf = {
             },
         },
         "plain": {
-            "format": '{levelname:8} [{asctime}] [{relativepath}:{lineno}] - "{message}"',
+            "format": '{levelname:8} [{asctime}] [{request_id}] [{relativepath}:{lineno}] - "{message}"',
             "datefmt": "%Y-%m-%d %H:%M:%S",
             "style": "{",
         },
         "plain_django": {
-            "format": "{levelname:8} [{asctime}] [{name}] --- {message}",
+            "format": "{levelname:8} [{asctime}] [{request_id}] [{name}] --- {message}",
             "datefmt": "%Y-%m-%d %H:%M:%S",
             "style": "{",
         },
+        "json": {
+            "()": JSONFormatter,
+        },
     },
     "handlers": {
         "console_app": {
@@ -89,25 +320,9 @@ logging_conf = {
             "formatter": "colored_django",
             "level": "INFO",
         },
-        "file_app": {
-            "class": "logging.handlers.RotatingFileHandler",
-            "filename": LOG_FILE,
-            "maxBytes": 10 * 1024 * 1024,
-            "backupCount": 2,
-            "formatter": "plain",
-            "filters": ["relative_path"],
-            "encoding": "utf-8",
-            "level": "DEBUG",
-        },
-        "file_django": {
-            "class": "logging.handlers.RotatingFileHandler",
-            "filename": LOG_FILE,
-            "maxBytes": 10 * 1024 * 1024,
-            "backupCount": 2,
-            "formatter": "plain_django",
-            "encoding": "utf-8",
-            "level": "INFO",
-        },
+        "file_app": file_handler(LOG_FILE, "plain", "DEBUG", ["relative_path"]),
+        # Its own file, two handlers rotating one file lose records
+        "file_django": file_handler(DJANGO_LOG_FILE, "plain_django", "INFO"),
     },
     "root": {
         "handlers": ["console_app", "file_app"],
@@ -132,4 +347,15 @@ logging_conf = {
     },
 }
 
+# Sampling runs on the logger, in the calling thread, before any handler formats the record
+for logger_conf in [logging_conf["root"], *logging_conf["loggers"].values()]:
+    logger_conf["filters"] = ["sampling"]
+
+if env.Logging.format == "json":
+    for handler in logging_conf["handlers"].values():
+        handler["formatter"] = "json"
+
+if env.Logging.queue:
+    logging_conf = queued(logging_conf, env.Logging.queue_size, env.Logging.queue_policy)
+
 logger = logging.getLogger("myapp")
@@ -0,0 +1,176 @@
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from myapp.configurations import metrics, query_budget
+from myapp.configurations.logging import RequestContext, logger, request_context
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+class RequestContextMiddleware:
+    """
+    Opens the logging context of a request: request_id (the incoming X-Request-ID or a new one),
+    the user, the view and the elapsed time are then stamped on every record logged while it runs.
+    Place it first so the other middleware log with the request id too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        context, token = self.open(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_context.reset(token)
+        response[REQUEST_ID_HEADER] = context.request_id
+        return response
+
+    async def __acall__(self, request):
+        context, token = self.open(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_context.reset(token)
+        response[REQUEST_ID_HEADER] = context.request_id
+        return response
+
+    @staticmethod
+    def open(request):
+        request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        context = RequestContext(request_id=request_id[:64], request=request)
+        request.request_id = context.request_id
+        return context, request_context.set(context)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        context = request_context.get()
+        if context is not None:
+            context.view = getattr(view_func, "view_class", view_func).__name__
+
+
+class MetricsMiddleware:
+    """
+    Per-view latency, status, response size and SQL counts for /metrics.
+    Disabled (MiddlewareNotUsed) when prometheus_client isn't installed.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if metrics.prometheus_client is None:
+            raise MiddlewareNotUsed("prometheus_client is not installed")
+        self.get_response = get_response
+        metrics.view_metrics.start()
+        # Connections opened before this module was imported missed connection_created
+        for connection in connections.all(initialized_only=True):
+            metrics.install_query_counter(connection)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.request_metrics.set(request_metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.request_metrics.reset(token)
+        self.observe(request, response, time.perf_counter() - start, request_metrics)
+        return response
+
+    async def __acall__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.request_metrics.set(request_metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.request_metrics.reset(token)
+        self.observe(request, response, time.perf_counter() - start, request_metrics)
+        return response
+
+    def observe(self, request, response, duration, request_metrics):
+        metrics.view_metrics.record(
+            metrics.view_name(request),
+            request.method,
+            str(response.status_code),
+            duration,
+            metrics.response_size(response),
+            request_metrics,
+        )
+
+
+class QueryBudgetMiddleware:
+    """
+    Enforces `query_budget` declared on the view (class attribute or @query_budget).
+    QUERY_BUDGET_MODE: "log" warns with the repeated SQL shapes and where they come from,
+    "raise" raises QueryBudgetExceeded (myapp/test_settings.py), "off" (the default) removes the middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.mode = settings.QUERY_BUDGET_MODE
+        if self.mode == "off":
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        for connection in connections.all(initialized_only=True):
+            query_budget.install_query_tracker(connection)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        tracker = query_budget.QueryTracker()
+        token = query_budget.query_tracker.set(tracker)
+        try:
+            response = self.get_response(request)
+        finally:
+            query_budget.query_tracker.reset(token)
+        self.check(request, tracker)
+        return response
+
+    async def __acall__(self, request):
+        tracker = query_budget.QueryTracker()
+        token = query_budget.query_tracker.set(tracker)
+        try:
+            response = await self.get_response(request)
+        finally:
+            query_budget.query_tracker.reset(token)
+        self.check(request, tracker)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        tracker = query_budget.query_tracker.get()
+        if tracker is not None:
+            tracker.budget = getattr(view_func, "query_budget", None)
+            if tracker.budget is None:
+                tracker.budget = getattr(getattr(view_func, "view_class", None), "query_budget", None)
+
+    def check(self, request, tracker):
+        if not tracker.exceeded:
+            return
+        report = tracker.report(metrics.view_name(request))
+        if self.mode == "raise":
+            raise query_budget.QueryBudgetExceeded(report)
+        logger.warning(report)
@@ -0,0 +1,139 @@
+import hashlib
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.inspectors import SwaggerAutoSchema
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+schema_info = openapi.Info(
+    title = 'Snippets API',
+    default_version='v1',
+    description='Test description',
+    license=openapi.License(name="TOS")
+)
+
+FORMATS = {
+    "json": ("schema.json", "application/json", OpenAPICodecJson),
+    "yaml": ("schema.yaml", "application/yaml", OpenAPICodecYaml),
+}
+
+# The content hash changes with the schema, clients may keep a copy for a day and revalidate after
+SCHEMA_MAX_AGE = 24 * 60 * 60
+
+
+class LazyResponsesAutoSchema(SwaggerAutoSchema):
+    """
+    Materializes the responses declared with swagger_response, only while a schema is being generated
+    """
+
+    def get_response_serializers(self):
+        lazy = self.overrides.get("lazy_responses")
+        if lazy is not None and "responses" not in self.overrides:
+            self.overrides["responses"] = lazy.build()
+        return super().get_response_serializers()
+
+
+class CachedSchemaGenerator(OpenAPISchemaGenerator):
+    """
+    Builds the public schema once per process, instead of introspecting every serializer per request.
+    Schemas restricted to the requesting user (public=False) are not cached.
+    """
+
+    _cache = {}
+    _lock = threading.Lock()
+
+    def get_schema(self, request=None, public=False):
+        if not public:
+            return super().get_schema(request, public)
+        key = (self.version, self.url, self._gen.urlconf, bool(self._gen.patterns == []))
+        schema = self._cache.get(key)
+        if schema is None:
+            with self._lock:
+                schema = self._cache.get(key)
+                if schema is None:
+                    schema = self._cache[key] = super().get_schema(request, public)
+        return schema
+
+
+# The UI pages only render the shell, the document itself comes from schema_file (SPEC_URL in settings)
+schema_view = get_schema_view(
+    schema_info,
+    public=True,
+    permission_classes=[permissions.AllowAny,],
+    generator_class=CachedSchemaGenerator,
+)
+swagger_ui = schema_view.with_ui('swagger', cache_timeout=0)
+redoc_ui = schema_view.with_ui('redoc', cache_timeout=0)
+
+
+def generate_schema():
+    return CachedSchemaGenerator(schema_info).get_schema(request=None, public=True)
+
+
+def encode_schema(schema, output):
+    _, _, codec = FORMATS[output]
+    return codec(validators=[]).encode(schema)
+
+
+class SchemaArtifact:
+    """
+    Encoded schema held in memory with its content hash.
+    Read from OPENAPI_SCHEMA_DIR (written by `manage.py build_openapi`), generated on first use otherwise.
+    """
+
+    _loaded = {}
+    _lock = threading.Lock()
+
+    def __init__(self, content, content_type):
+        self.content = content
+        self.content_type = content_type
+        self.etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+    @classmethod
+    def get(cls, output):
+        artifact = cls._loaded.get(output)
+        if artifact is None:
+            with cls._lock:
+                artifact = cls._loaded.get(output)
+                if artifact is None:
+                    artifact = cls._loaded[output] = cls.load(output)
+        return artifact
+
+    @classmethod
+    def load(cls, output):
+        filename, content_type, _ = FORMATS[output]
+        path = Path(settings.OPENAPI_SCHEMA_DIR) / filename
+        if path.exists():
+            return cls(path.read_bytes(), content_type)
+        return cls(encode_schema(generate_schema(), output), content_type)
+
+    @classmethod
+    def reset(cls):
+        cls._loaded.clear()
+        CachedSchemaGenerator._cache.clear()
+
+
+def schema_output(format):
+    output = (format or "json").lstrip(".")
+    if output not in FORMATS:
+        raise Http404("Unknown schema format")
+    return output
+
+
+@condition(etag_func=lambda request, format=None: SchemaArtifact.get(schema_output(format)).etag)
+def schema_file(request, format=None):
+    """
+    The OpenAPI document without the drf-yasg view, served from memory with a content-hash ETag
+    """
+    artifact = SchemaArtifact.get(schema_output(format))
+    response = HttpResponse(artifact.content, content_type=artifact.content_type)
+    patch_cache_control(response, public=True, max_age=SCHEMA_MAX_AGE)
+    return response
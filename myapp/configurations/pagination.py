@@ -0,0 +1,145 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+
+@dataclass
+class KeysetPage:
+    objects: list
+    next_cursor: str | None
+    previous_cursor: str | None
+    page_size: int
+
+    def payload(self, data):
+        """
+        Body for `success()`, the renderer unwraps it into the envelope's `data`.
+        """
+        return {
+            "results": data,
+            "next": self.next_cursor,
+            "previous": self.previous_cursor,
+            "page_size": self.page_size,
+        }
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over (created_at, id) for any BaseModel subclass.
+
+    Every page is a range scan on the created_at index starting from the
+    last row of the previous page, so page 10_000 costs the same as page 1.
+    Cursors are opaque base64 tokens: {"c": created_at, "i": id, "d": direction}
+
+    Subclasses can page over another column (or annotation) with `ordering_field`
+    and `encode_value` / `decode_value`.
+    """
+
+    ordering_field = "created_at"
+    default_page_size = 50
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    descending = True
+
+    def __init__(self, page_size=None, max_page_size=None, descending=None):
+        if page_size is not None:
+            self.default_page_size = page_size
+        if max_page_size is not None:
+            self.max_page_size = max_page_size
+        if descending is not None:
+            self.descending = descending
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw is None:
+            return self.default_page_size
+        try:
+            page_size = int(raw)
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: "Must be an integer"})
+        if page_size < 1:
+            raise ValidationError({self.page_size_query_param: "Must be positive"})
+        return min(page_size, self.max_page_size)
+
+    def encode_value(self, value):
+        return value.isoformat()
+
+    def decode_value(self, value):
+        return datetime.fromisoformat(value)
+
+    def encode_cursor(self, obj, forward):
+        position = {
+            "c": self.encode_value(getattr(obj, self.ordering_field)),
+            "i": obj.pk,
+            "d": "n" if forward else "p",
+        }
+        raw = json.dumps(position, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded))
+            return (
+                self.decode_value(position["c"]),
+                # Anything but an integer pk would only fail once the query runs
+                int(position["i"]),
+                position["d"] == "n",
+            )
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise ValidationError({self.cursor_query_param: "Invalid cursor"})
+
+    def _ordering(self, forward):
+        # Walking backwards flips the ordering so the index is still read in one pass
+        desc = self.descending == forward
+        prefix = "-" if desc else ""
+        return (f"{prefix}{self.ordering_field}", f"{prefix}pk"), desc
+
+    def _after(self, value, pk, desc):
+        field, op = self.ordering_field, "lt" if desc else "gt"
+        return Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"pk__{op}": pk})
+
+    def _window(self, queryset, request):
+        page_size = self.get_page_size(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+
+        forward = True
+        if cursor:
+            value, pk, forward = self.decode_cursor(cursor)
+
+        ordering, desc = self._ordering(forward)
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(self._after(value, pk, desc))
+
+        # One extra row tells us whether another page exists without a COUNT(*)
+        return queryset[: page_size + 1], page_size, bool(cursor), forward
+
+    def _page(self, objects, page_size, has_cursor, forward):
+        has_more = len(objects) > page_size
+        objects = objects[:page_size]
+
+        if not forward:
+            objects.reverse()
+
+        next_cursor = previous_cursor = None
+        if objects:
+            if has_more or not forward:
+                next_cursor = self.encode_cursor(objects[-1], forward=True)
+            if has_cursor and (forward or has_more):
+                previous_cursor = self.encode_cursor(objects[0], forward=False)
+
+        return KeysetPage(objects, next_cursor, previous_cursor, page_size)
+
+    def paginate(self, queryset, request):
+        window, *position = self._window(queryset, request)
+        return self._page(list(window), *position)
+
+    async def apaginate(self, queryset, request):
+        window, *position = self._window(queryset, request)
+        return self._page([obj async for obj in window], *position)
@@ -0,0 +1,101 @@
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+
+from myapp.configurations.logging import PROJECT_ROOT, relative_path
+
+# "IN (%s, %s, %s)" and "IN (%s)" are the same query shape
+IN_LIST_RE = re.compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)")
+
+DJANGO_DIR = os.path.dirname(__import__("django").__file__)
+SKIP_DIRS = (DJANGO_DIR, os.path.dirname(os.__file__), os.path.dirname(__file__))
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(limit):
+    """
+    Declares the most queries a request to the view may run, for function views or APIView classes.
+    Same as setting `query_budget = limit` on the class.
+    """
+
+    def decorator(view):
+        view.query_budget = limit
+        return view
+
+    return decorator
+
+
+def sql_shape(sql):
+    return IN_LIST_RE.sub("(%s...)", sql)
+
+
+def query_origin():
+    """
+    First project frame below the ORM, "users/views.py:186 in get_permissions"
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PROJECT_ROOT) and not filename.startswith(SKIP_DIRS) and "site-packages" not in filename:
+            return f"{relative_path(filename)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class QueryTracker:
+    """
+    SQL of one request, grouped by shape with where each shape was issued from.
+    """
+
+    __slots__ = ("budget", "count", "shapes", "origins")
+
+    def __init__(self):
+        self.budget = None
+        self.count = 0
+        self.shapes = Counter()
+        self.origins = defaultdict(Counter)
+
+    def add(self, sql):
+        shape = sql_shape(sql)
+        self.count += 1
+        self.shapes[shape] += 1
+        self.origins[shape][query_origin()] += 1
+
+    @property
+    def exceeded(self):
+        return self.budget is not None and self.count > self.budget
+
+    def report(self, view):
+        lines = [f"{view} ran {self.count} queries, budget is {self.budget}"]
+        for shape, count in self.shapes.most_common():
+            if count < 2:
+                continue
+            origins = ", ".join(f"{origin} x{n}" for origin, n in self.origins[shape].most_common(3))
+            lines.append(f"  {count}x {shape[:200]}\n      from {origins}")
+        return "\n".join(lines)
+
+
+query_tracker = ContextVar("query_tracker", default=None)
+
+
+def track_queries(execute, sql, params, many, context):
+    tracker = query_tracker.get()
+    # Only views that declare a budget pay for the shape and stack bookkeeping
+    if tracker is not None and tracker.budget is not None:
+        tracker.add(sql)
+    return execute(sql, params, many, context)
+
+
+def install_query_tracker(connection, **kwargs):
+    if track_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(track_queries)
+
+
+connection_created.connect(install_query_tracker)
@@ -1,6 +1,53 @@
 # renderers.py
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from rest_framework.renderers import JSONRenderer
 from rest_framework import status as h
+from rest_framework.utils.encoders import JSONEncoder
+from myapp.utils.responses import EnvelopeResponse
+
+try:
+    import orjson
+except ImportError:  # optional, `pip install myapp[fast-json]`
+    orjson = None
+
+
+# orjson writes floats below 1e-4 as 0.00001 or 1e-7 where repr() gives 1e-05 and 1e-07, every other
+# finite float is identical. Matches inside strings only cost a stdlib re-encode.
+_ORJSON_SMALL_FLOAT = re.compile(rb"0\.0000|e-\d(?!\d)")
+
+
+def _dumps_orjson(data, default):
+    """
+    Compact UTF-8 output matching DRF's JSONRenderer.
+    - datetime and dataclass values are passed to DRF's encoder so their text is identical
+    - returns None when orjson cannot encode the value (e.g. ints above 64 bits) or wrote a
+      float differently, the stdlib path then encodes it
+    - NaN and Infinity become null where the stdlib path raises, orjson has no way to reject them
+    """
+    try:
+        ret = orjson.dumps(
+            data,
+            default=default,
+            option=orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS,
+        )
+    except orjson.JSONEncodeError:
+        return None
+    if _ORJSON_SMALL_FLOAT.search(ret):
+        return None
+    return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+# REST_FRAMEWORK["JSON_ENCODER_BACKEND"] -> encoder, "stdlib" is DRF's own json.dumps path
+JSON_BACKENDS = {
+    "stdlib": None,
+    "orjson": _dumps_orjson if orjson is not None else None,
+}
+
 
 class ApiWrapperRenderer(JSONRenderer):
     """
@@ -24,33 +71,79 @@ class ApiWrapperRenderer(JSONRenderer):
         h.HTTP_500_INTERNAL_SERVER_ERROR: "An internal server error occurred.",
     }
 
+    def get_backend(self):
+        name = settings.REST_FRAMEWORK.get("JSON_ENCODER_BACKEND", "stdlib")
+        if name not in JSON_BACKENDS:
+            raise ImproperlyConfigured(
+                f"Unknown JSON_ENCODER_BACKEND {name!r}, expected one of {list(JSON_BACKENDS)}"
+            )
+        dumps = JSON_BACKENDS[name]
+        if name != "stdlib" and dumps is None:
+            raise ImproperlyConfigured(
+                f"JSON_ENCODER_BACKEND is {name!r} but {name} is not installed (pip install myapp[fast-json])"
+            )
+        return dumps
+
+    def encode(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Encode with the configured backend, falling back to DRF's stdlib json.dumps
+        whenever the fast path could not produce identical bytes (indent, ASCII
+        escaping, or a value the backend rejects).
+        """
+        dumps = self.get_backend()
+        if (
+            dumps is not None
+            and data is not None
+            and self.compact
+            and not self.ensure_ascii
+            and self.get_indent(accepted_media_type, renderer_context or {}) is None
+        ):
+            ret = dumps(data, JSONEncoder().default)
+            if ret is not None:
+                return ret
+        return super().render(data, accepted_media_type, renderer_context)
+
     def render(self, data, accepted_media_type=None, renderer_context=None):
         if not renderer_context:
-            return super().render(data, accepted_media_type, renderer_context)
+            return self.encode(data, accepted_media_type, renderer_context)
 
         response = renderer_context['response']
         status_code = response.status_code
+
+        if isinstance(response, EnvelopeResponse):
+            # success()/error() already split the body, encode it in one pass
+            message = response.message
+            if message is None:
+                message = self.DEFAULT_MESSAGES.get(status_code, "An error occurred")
+            return self.encode(
+                self.envelope(status_code, message, data), accepted_media_type, renderer_context
+            )
+
+        # Plain Responses (DRF exceptions, third-party views) are unwrapped without mutating them
         current_data = data or {}
 
         message = self.DEFAULT_MESSAGES.get(status_code, "An error occurred")
 
         if isinstance(current_data, dict):
-            if "detail" in current_data:
-                message = current_data.pop("detail")
-            elif "message" in current_data:
-                message = current_data.pop("message")
+            if "detail" in current_data or "message" in current_data:
+                current_data = dict(current_data)
+                if "detail" in current_data:
+                    message = current_data.pop("detail")
+                else:
+                    message = current_data.pop("message")
 
-            data = current_data.pop("data", current_data)
+            data = current_data.get("data", current_data)
 
-        status = "Error" if status_code >= 400 else "Success"
+        return self.encode(
+            self.envelope(status_code, message, data), accepted_media_type, renderer_context
+        )
 
-        wrapped_data = {
-            "status": status,
+    @staticmethod
+    def envelope(status_code, message, data):
+        # The only dict built per response, `data` is referenced, not copied
+        return {
+            "status": "Error" if status_code >= 400 else "Success",
             "status_code": status_code,
             "message": message,
             "data": data,
         }
-
-        response.data = wrapped_data
-
-        return super().render(wrapped_data, accepted_media_type, renderer_context)
@@ -0,0 +1,224 @@
+import hashlib
+import math
+import time
+
+from django.core.cache import cache as default_cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """
+    "20/min" -> (20, 60), the bucket holds 20 tokens and refills 20 tokens over 60 seconds
+    """
+    capacity, period = rate.split("/")
+    return int(capacity), PERIODS[period[0]]
+
+
+def emission_interval(capacity, period):
+    """
+    Milliseconds between two tokens, "20/min" -> 3000
+    """
+    return max(1, round(period * 1000 / capacity))
+
+
+def gcra(tat, now, period):
+    """
+    Decision for a request whose charge moved the bucket's theoretical arrival time to `tat` (GCRA, ms).
+    The bucket holds `period` worth of tokens, so the request passes while `tat` is at most `period` ahead.
+    Returns (allowed, retry_after, timeout), timeout being when the bucket is full again and its key can go
+    """
+    ahead = tat - now
+    excess = ahead - period * 1000
+    if excess <= 0:
+        return True, 0, max(1, math.ceil(ahead / 1000))
+    return False, excess / 1000, None
+
+
+async def allow_request_async(throttle, request, view):
+    """
+    Awaits the throttle's aallow_request when it has one, other throttles (DRF's own) run inline
+    """
+    aallow_request = getattr(throttle, "aallow_request", None)
+    if aallow_request is not None:
+        return await aallow_request(request, view)
+    return throttle.allow_request(request, view)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket kept in the shared cache as one integer per key, the time (ms) at which it would
+    be full again (GCRA), so every worker sharing the cache (Redis, Memcached) sees the same bucket.
+    Bursts are capped at `capacity`, after that requests pass at capacity / period per second.
+
+    Lock-free: each request charges one emission interval with the atomic `cache.incr`. An allowed
+    request then `touch`es the key to expire when the bucket is full again (a missing key is a full
+    bucket, created with `add`); a rejected one gives its interval back with `decr`. That is two
+    round trips per bucket, and concurrent requests never wait on each other.
+    Rates are looked up as "<view.throttle_scope>_<bucket>" in the view's
+    `throttle_rates` dict, then in REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"];
+    a missing rate disables that bucket for the view.
+
+    Throttles run in APIView.initial(), before the serializer or the password hasher.
+    """
+
+    bucket = None
+    cache = default_cache
+
+    def get_rate(self, view):
+        scope = getattr(view, "throttle_scope", None)
+        if not scope:
+            return None, None
+        rates = getattr(view, "throttle_rates", None) or api_settings.DEFAULT_THROTTLE_RATES
+        return scope, rates.get(f"{scope}_{self.bucket}")
+
+    def get_ident_key(self, request):
+        raise NotImplementedError(".get_ident_key() must be overridden")
+
+    def get_bucket(self, request, view):
+        """
+        (cache key, capacity, period), None when the bucket doesn't apply to this request
+        """
+        scope, rate = self.get_rate(view)
+        if rate is None:
+            return None
+        ident = self.get_ident_key(request)
+        if ident is None:
+            return None
+        capacity, period = parse_rate(rate)
+        return f"throttle:{scope}:{self.bucket}:{ident}", capacity, period
+
+    def allow_request(self, request, view):
+        bucket = self.get_bucket(request, view)
+        if bucket is None:
+            return True
+        key, capacity, period = bucket
+        interval = emission_interval(capacity, period)
+        now = time.time_ns() // 1_000_000
+
+        try:
+            tat = self.cache.incr(key, interval)
+        except ValueError:
+            if self.cache.add(key, now + interval, timeout=math.ceil(interval / 1000)):
+                tat = now + interval
+            else:
+                # Created by a concurrent request in between
+                try:
+                    tat = self.cache.incr(key, interval)
+                except ValueError:
+                    return True
+
+        allowed, self.retry_after, timeout = gcra(tat, now, period)
+        if allowed:
+            self.cache.touch(key, timeout)
+        else:
+            self.cache.decr(key, interval)
+        return allowed
+
+    async def aallow_request(self, request, view):
+        """
+        allow_request over the async cache API, for AsyncAPIView
+        """
+        bucket = self.get_bucket(request, view)
+        if bucket is None:
+            return True
+        key, capacity, period = bucket
+        interval = emission_interval(capacity, period)
+        now = time.time_ns() // 1_000_000
+
+        try:
+            tat = await self.cache.aincr(key, interval)
+        except ValueError:
+            if await self.cache.aadd(key, now + interval, timeout=math.ceil(interval / 1000)):
+                tat = now + interval
+            else:
+                try:
+                    tat = await self.cache.aincr(key, interval)
+                except ValueError:
+                    return True
+
+        allowed, self.retry_after, timeout = gcra(tat, now, period)
+        if allowed:
+            await self.cache.atouch(key, timeout)
+        else:
+            await self.cache.adecr(key, interval)
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class ChainedThrottle(BaseThrottle):
+    """
+    Runs `throttle_classes` in order and stops at the first rejection,
+    so later buckets are only charged for requests the earlier ones let through
+    """
+
+    throttle_classes = ()
+
+    def allow_request(self, request, view):
+        self.rejected_by = None
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not throttle.allow_request(request, view):
+                self.rejected_by = throttle
+                return False
+        return True
+
+    async def aallow_request(self, request, view):
+        self.rejected_by = None
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not await allow_request_async(throttle, request, view):
+                self.rejected_by = throttle
+                return False
+        return True
+
+    def wait(self):
+        return self.rejected_by.wait() if self.rejected_by is not None else None
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    bucket = "ip"
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class UsernameTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Keyed by the submitted username, so a credential-stuffing run spread over many IPs still hits one bucket
+    """
+
+    bucket = "username"
+
+    def get_ident_key(self, request):
+        username = request.data.get("username") if hasattr(request.data, "get") else None
+        if not username:
+            return None
+        return hashlib.md5(str(username).lower().encode(), usedforsecurity=False).hexdigest()
+
+
+class GlobalTokenBucketThrottle(TokenBucketThrottle):
+    """
+    One bucket per scope for the whole deployment, sheds load before the CPU saturates
+    """
+
+    bucket = "global"
+
+    def get_ident_key(self, request):
+        return "all"
+
+
+class AuthThrottle(ChainedThrottle):
+    """
+    Per IP, then per username, then the deployment-wide bucket: one client hammering login
+    empties its own buckets and never spends the global tokens everyone else needs
+    """
+
+    throttle_classes = (IPTokenBucketThrottle, UsernameTokenBucketThrottle, GlobalTokenBucketThrottle)
+
+
+AUTH_THROTTLES = [AuthThrottle]
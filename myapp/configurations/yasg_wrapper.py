@@ -1,6 +1,9 @@
+from functools import lru_cache
+
 from rest_framework import serializers
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
+
+# drf_yasg (with jsonschema and the spec validator) is only imported once a schema is generated,
+# nothing here may import it at module level
 
 
 class ResponseWrapperSerializer(serializers.Serializer):
@@ -10,6 +13,10 @@ class ResponseWrapperSerializer(serializers.Serializer):
     data = serializers.JSONField()
 
 
+def is_serializer_class(value):
+    return isinstance(value, type) and issubclass(value, serializers.BaseSerializer)
+
+
 def make_response_serializer(
     data_serializer_or_example,
     ref_name: str,
@@ -28,8 +35,7 @@ def make_response_serializer(
 
     # Case 1: dict of serializers
     if isinstance(data_serializer_or_example, dict) and all(
-        isinstance(v, type) and issubclass(v, serializers.BaseSerializer)
-        for v in data_serializer_or_example.values()
+        is_serializer_class(v) for v in data_serializer_or_example.values()
     ):
         fields = {key: ser() for key, ser in data_serializer_or_example.items()}
         Nested = type(
@@ -40,9 +46,7 @@ def make_response_serializer(
         data_field = Nested()
 
     # Case 2: serializer class
-    elif isinstance(data_serializer_or_example, type) and issubclass(
-        data_serializer_or_example, serializers.BaseSerializer
-    ):
+    elif is_serializer_class(data_serializer_or_example):
         data_field = data_serializer_or_example()
 
     # Case 3: callable returning serializer
@@ -70,6 +74,102 @@ def make_response_serializer(
     return type(f"{ref_name}Wrapper", (serializers.Serializer,), attrs)
 
 
+# Raw example dicts all document as the same JSON `data`, they share one wrapper per status code
+RAW_EXAMPLE = "Json"
+
+
+def data_key(data):
+    """
+    Hashable identity of what goes inside `data`, equal for every endpoint documenting the same payload
+    """
+    if isinstance(data, dict):
+        if not data:
+            return serializers.Serializer
+        if all(is_serializer_class(v) for v in data.values()):
+            return tuple(data.items())
+        return RAW_EXAMPLE
+    return data
+
+
+def data_label(key):
+    if key is RAW_EXAMPLE:
+        return RAW_EXAMPLE
+    if isinstance(key, tuple):
+        return "".join(name.title().replace("_", "") for name, _ in key)
+    if key is None or key is serializers.Serializer:
+        return "Empty"
+    meta = getattr(key, "Meta", None)
+    ref_name = getattr(meta, "ref_name", None)
+    if ref_name:
+        return ref_name
+    return key.__qualname__.replace(".", "").removesuffix("Serializer")
+
+
+# ref_name -> data key, definitions are shared between endpoints so names must stay unique
+_ref_names = {}
+
+
+def unique_ref_name(base, key):
+    ref_name, n = base, 1
+    while _ref_names.setdefault(ref_name, key) != key:
+        n += 1
+        ref_name = f"{base}{n}"
+    return ref_name
+
+
+@lru_cache(maxsize=None)
+def response_wrapper(key, code):
+    """
+    One wrapper serializer per (data, status code), built on first use and shared by every endpoint.
+    The per-endpoint message lives in the response example, not in the class.
+    """
+    ref_name = unique_ref_name(f"{data_label(key)}{code}Response", key)
+    data = dict(key) if isinstance(key, tuple) else ({} if key is RAW_EXAMPLE else key)
+    return make_response_serializer(
+        data,
+        ref_name=ref_name,
+        status_example="Error" if code >= 400 else "Success",
+        status_code_example=code,
+        message_example="Error" if code >= 400 else "Success",
+    )
+
+
+class LazyResponses:
+    """
+    The responses of one swagger_response, kept as plain specs until schema generation asks for them.
+    Workers that never render the schema never create a serializer class.
+    """
+
+    def __init__(self, specs):
+        # [(code, data, description, message, example)]
+        self.specs = specs
+        self._built = None
+
+    def build(self):
+        from drf_yasg import openapi
+
+        if self._built is None:
+            self._built = {
+                code: openapi.Response(
+                    description=desc,
+                    schema=response_wrapper(data_key(data), code),
+                    examples={
+                        "application/json": {
+                            "status": "Error" if code >= 400 else "Success",
+                            "status_code": code,
+                            "message": message,
+                            "data": example,
+                        }
+                    },
+                )
+                for code, data, desc, message, example in self.specs
+            }
+        return self._built
+
+    def __deepcopy__(self, memo):
+        # drf-yasg deep-copies the overrides of every operation, the specs are never mutated
+        return self
+
 
 def swagger_response(
     *,
@@ -80,63 +180,65 @@ def swagger_response(
     include_forbidden: bool = True,
 ):
     """
-    Flexible decorator for swagger_auto_schema:
+    Flexible swagger_auto_schema for APIView handlers:
     - output_serializer: the default serializer used inside `data` for 200 responses
     - input_serializer: request body serializer (optional, only for POST/PUT/PATCH/DELETE)
     - many: if True, `data` will be a list
-    - responses: dict of status_code -> {"serializer": Serializer|dict, "desc": str, "message": str}
+    - responses: dict of status_code -> {"serializer": Serializer|dict, "desc": str, "message": str, "example": dict}
     - include_forbidden: whether to always include a 403 response
+
+    Wrapper serializers are created when the schema is generated (see openapi.LazyResponsesAutoSchema),
+    not at import.
     """
     def decorator(func):
-        ref_base = func.__qualname__
-        final_responses = {}
+        specs = []
 
         if responses:
             for code, opts in responses.items():
-                serializer_cls = opts.get("serializer", serializers.Serializer)
-                desc = opts.get("desc", "Response")
                 # 👇 auto-pick message unless explicitly set
                 msg = opts.get("message") or (
                     "Success" if code < 400 else "Error"
                 )
+                specs.append((
+                    code,
+                    opts.get("serializer", serializers.Serializer),
+                    opts.get("desc", "Response"),
+                    msg,
+                    opts.get("example", {}),
+                ))
 
-                wrapped = make_response_serializer(
-                    serializer_cls,
-                    ref_name=f"{ref_base}{code}Response",
-                    status_example="Error" if code >= 400 else "Success",
-                    status_code_example=code,
-                    message_example=msg,   # <-- used only as example
-                )
-                final_responses[code] = openapi.Response(description=desc, schema=wrapped)
-
-        if output_serializer and 200 not in final_responses:
-            wrapped = make_response_serializer(
-                output_serializer,
-                ref_name=f"{ref_base}200Response",
-                status_example="Success",
-                status_code_example=200,
-                message_example="Success",   # auto-default
-            )
-            final_responses[200] = openapi.Response(description="Successful response", schema=wrapped)
-
-        if include_forbidden and 403 not in final_responses:
-            wrapped = make_response_serializer(
-                serializers.Serializer,
-                ref_name=f"{ref_base}403Response",
-                status_example="Error",
-                status_code_example=403,
-                message_example="Forbidden",
-            )
-            final_responses[403] = openapi.Response(description="Forbidden", schema=wrapped)
+        codes = {code for code, *_ in specs}
+        if output_serializer and 200 not in codes:
+            specs.append((200, output_serializer, "Successful response", "Success", {}))
+
+        if include_forbidden and 403 not in codes:
+            specs.append((403, serializers.Serializer, "Forbidden", "Forbidden", {}))
 
         # request_body only for methods that support it
         body = None
         if input_serializer and func.__name__.lower() in ["post", "put", "patch", "delete"]:
             body = input_serializer
 
-        return swagger_auto_schema(
-            request_body=body,
-            responses=final_responses,
-        )(func)
+        # What swagger_auto_schema(request_body=..., lazy_responses=...) stores on a plain view method,
+        # without importing drf_yasg
+        overrides = {"lazy_responses": LazyResponses(specs)}
+        if body is not None:
+            overrides["request_body"] = body
+        func._swagger_auto_schema = overrides
+        return func
+
+    return decorator
+
+
+def inherit_swagger_schema(source):
+    """
+    Reuse the swagger_response documentation of `source` on another handler,
+    e.g. an async override of a documented sync view method.
+    """
+    def decorator(func):
+        overrides = getattr(source, "_swagger_auto_schema", None)
+        if overrides is not None:
+            func._swagger_auto_schema = overrides
+        return func
 
     return decorator
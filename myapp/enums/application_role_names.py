@@ -1,20 +1,53 @@
-from types import SimpleNamespace
+import sys
+from typing import NamedTuple
+
+from django.apps import apps
+from django.core.exceptions import AppRegistryNotReady
+
+
+class ModelPermissions(NamedTuple):
+    add: str
+    change: str
+    delete: str
+    view: str
+
 
 class PermissionEnumMeta(type):
     """
-    Metaclass to dynamically generate CRUD permissions for any model accessed.
+    Metaclass exposing the CRUD permission codenames of every installed model.
     Example: PermissionEnum.Conference.add => "add_conference"
+
+    The table is built once from the app registry (UsersConfig.ready) and set as
+    plain class attributes, so a lookup never reaches __getattr__ and allocates
+    nothing. Only unknown names fall through to __getattr__, which raises.
     """
+
+    def load(cls, app_registry=apps):
+        for model in app_registry.get_models():
+            model_name = model._meta.model_name
+            permissions = ModelPermissions(
+                *(sys.intern(f"{action}_{model_name}") for action in ModelPermissions._fields)
+            )
+            # Both PermissionEnum.TenantRoleGroup and PermissionEnum.tenantrolegroup
+            setattr(cls, model._meta.object_name, permissions)
+            setattr(cls, model_name, permissions)
+        cls._loaded = True
+
     def __getattr__(cls, model_name):
-        # Normalize to lowercase for codename convention
-        model_name_lower = model_name.lower()
-        # Return a SimpleNamespace with standard CRUD permissions
-        return SimpleNamespace(
-            add=f"add_{model_name_lower}",
-            change=f"change_{model_name_lower}",
-            delete=f"delete_{model_name_lower}",
-            view=f"view_{model_name_lower}"
-        )
+        if model_name.startswith("__"):
+            raise AttributeError(model_name)
+
+        if not cls.__dict__.get("_loaded"):
+            if not apps.models_ready:
+                raise AppRegistryNotReady(
+                    f"PermissionEnum.{model_name} accessed before the models were loaded"
+                )
+            cls.load()
+            if model_name in cls.__dict__:
+                return cls.__dict__[model_name]
+
+        raise AttributeError(f"PermissionEnum has no installed model named {model_name!r}")
+
 
 class PermissionEnum(metaclass=PermissionEnumMeta):
-    pass
\ No newline at end of file
+    pass
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db.models import Q
+
+from myapp.utils.cache import LocalTTLCache, bump_namespace, versioned_key
+
+PERMISSIONS_NAMESPACE = "permissions"
+
+_local = LocalTTLCache(
+    maxsize=settings.PERMISSION_LOCAL_CACHE_SIZE,
+    ttl=settings.PERMISSION_LOCAL_CACHE_TTL,
+)
+
+
+def _load_codenames(user):
+    rows = (
+        Permission.objects.filter(Q(user=user) | Q(group__user=user))
+        .values_list("content_type__app_label", "codename")
+        .distinct()
+    )
+    # Both "view_user" (PermissionEnum) and "users.view_user" (user.has_perm) forms
+    return frozenset(
+        name for app_label, codename in rows for name in (codename, f"{app_label}.{codename}")
+    )
+
+
+def get_user_codenames(user):
+    """
+    Effective permission codenames of a user, from groups and direct grants.
+    Looked up in the process LRU, then the shared cache, then the database.
+    """
+    # The local hit is a dict lookup, no cache round trip for the namespace version
+    codenames = _local.get(user.pk)
+    if codenames is not None:
+        return codenames
+
+    key = versioned_key(PERMISSIONS_NAMESPACE, user.pk)
+    codenames = cache.get(key)
+    if codenames is None:
+        codenames = _load_codenames(user)
+        cache.set(key, codenames, timeout=settings.PERMISSION_CACHE_TIMEOUT)
+
+    _local.set(user.pk, codenames)
+    return codenames
+
+
+def invalidate_user_codenames(user_id):
+    _local.delete(user_id)
+    cache.delete(versioned_key(PERMISSIONS_NAMESPACE, user_id))
+
+
+def invalidate_all_codenames():
+    bump_namespace(PERMISSIONS_NAMESPACE)
+    _local.clear()
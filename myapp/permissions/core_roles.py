@@ -1,10 +1,35 @@
 from django.contrib.auth.models import Group
 from rest_framework.permissions import BasePermission
 from myapp.enums.role_names import RoleNameEnum
+from myapp.permissions.codenames import get_user_codenames
 
 
 class IsSuperAdmin(BasePermission):
     message = "User is not Super Admin"
 
     def has_permission(self, request, view):
-        return request.user.is_superuser
\ No newline at end of file
+        return request.user.is_superuser
+
+
+class HasPermission(BasePermission):
+    """
+    Require every given codename, e.g. `permission_classes = [HasPermission(PermissionEnum.User.view)]`.
+    The user's codenames are resolved once and cached, a check is a set lookup.
+    """
+
+    message = "You do not have permission to perform this action."
+
+    def __init__(self, *codenames):
+        self.codenames = frozenset(codenames)
+
+    def __call__(self):
+        # DRF instantiates permission_classes, hand back the configured instance
+        return self
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated or not user.is_active:
+            return False
+        if user.is_superuser:
+            return True
+        return self.codenames <= get_user_codenames(user)
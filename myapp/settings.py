@@ -35,6 +35,9 @@ INSTALLED_APPS = [
 
 # Middleware definition
 MIDDLEWARE = [
+    "myapp.configurations.middleware.RequestContextMiddleware",
+    "myapp.configurations.middleware.MetricsMiddleware",
+    "myapp.configurations.middleware.QueryBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -44,6 +47,9 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# "off" (default), "log" or "raise" for views over their query_budget, myapp/test_settings.py raises
+QUERY_BUDGET_MODE = env.query_budget_mode
+
 ROOT_URLCONF = "myapp.urls"
 
 TEMPLATES = [
@@ -63,6 +69,17 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "myapp.wsgi.application"
 
+ASGI_APPLICATION = "myapp.asgi.application"
+
+# Route the async twins of login/whoami/user list, turn on when serving myapp.asgi
+ASYNC_VIEWS = env.async_views
+
+
+# Under ASGI (ASYNC_VIEWS) sync ORM calls run in per-request threads whose persistent connections are
+# never reused, so connections close after each request there unless DB_CONN_MAX_AGE is set (prefer DB_POOL)
+conn_max_age = env.Database.conn_max_age
+if conn_max_age is None:
+    conn_max_age = 0 if ASYNC_VIEWS else 60
 
 DATABASES = {
     "default": {
@@ -72,9 +89,46 @@ DATABASES = {
         "PASSWORD": env.Database.password,
         "HOST": env.Database.host,
         "PORT": env.Database.port,
+        # Keep connections open between requests, checked before reuse so a restarted server isn't a 500
+        "CONN_MAX_AGE": conn_max_age,
+        "CONN_HEALTH_CHECKS": env.Database.conn_health_checks,
+    }
+}
+
+# Native psycopg 3 pool (pip install ".[pool]"), one pool per worker process.
+# Size max_size so workers * max_size stays under the server's max_connections.
+if env.Database.pool:
+    DATABASES["default"]["CONN_MAX_AGE"] = 0  # the pool owns connection lifetime
+    DB_POOL_OPTIONS = {
+        "min_size": env.Database.pool_min_size,
+        "max_size": env.Database.pool_max_size,
+        "timeout": env.Database.pool_timeout,
+    }
+    try:
+        from psycopg_pool import ConnectionPool
+
+        # Health check on checkout, the pool replaces connections the server dropped
+        DB_POOL_OPTIONS["check"] = ConnectionPool.check_connection
+    except ImportError:
+        pass  # Django reports the missing psycopg[pool] on first connect
+    DATABASES["default"]["OPTIONS"] = {"pool": DB_POOL_OPTIONS}
+
+# Use a shared backend (e.g. django.core.cache.backends.redis.RedisCache) when running several workers
+CACHES = {
+    "default": {
+        "BACKEND": env.Cache.backend,
+        "LOCATION": env.Cache.location,
     }
 }
 
+# Seconds a cached /users/whoami payload lives, signals invalidate it earlier on changes
+WHOAMI_CACHE_TIMEOUT = env.Cache.whoami_timeout
+
+# Effective permission codenames: shared cache lifetime, then the per-process LRU (its TTL bounds cross-worker staleness)
+PERMISSION_CACHE_TIMEOUT = 300
+PERMISSION_LOCAL_CACHE_TTL = 30
+PERMISSION_LOCAL_CACHE_SIZE = 4096
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -91,6 +145,27 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Bounded pool for password hashing, KIND None hashes inline, "thread" or "process" offloads it
+PASSWORD_HASHING_EXECUTOR = {
+    "KIND": env.Hashing.executor,
+    "MAX_WORKERS": env.Hashing.max_workers,
+    "MAX_QUEUE": env.Hashing.max_queue,
+    "QUEUE_TIMEOUT": 0.1,
+    "TIMEOUT": 10.0,
+}
+
+
+# Written by `manage.py build_openapi`, served from memory by myapp.configurations.openapi.schema_file
+OPENAPI_SCHEMA_DIR = BASE_DIR / "openapi"
+
+SWAGGER_SETTINGS = {
+    "SPEC_URL": ("schema-json", {"format": ".json"}),
+    "DEFAULT_AUTO_SCHEMA_CLASS": "myapp.configurations.openapi.LazyResponsesAutoSchema",
+}
+REDOC_SETTINGS = {
+    "SPEC_URL": ("schema-json", {"format": ".json"}),
+}
+
 
 LANGUAGE_CODE = "en-us"
 
@@ -110,6 +185,17 @@ REST_FRAMEWORK = {
         "rest_framework.authentication.SessionAuthentication"
     ],
     "EXCEPTION_HANDLER": "myapp.configurations.exception_handler.global_exception_handler",
+    # "orjson" when installed (pip install myapp[fast-json]), "stdlib" otherwise.
+    # orjson renders NaN and Infinity as null where stdlib raises, everything else is byte-identical
+    "JSON_ENCODER_BACKEND": "stdlib",
+    # Token buckets "<throttle_scope>_<ip|username|global>": "<tokens>/<period>", see configurations/throttling.py
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": "20/min",
+        "login_username": "10/min",
+        "login_global": "600/min",
+        "register_ip": "10/min",
+        "register_global": "120/min",
+    },
 }
 
 LOGGING = logging_conf
@@ -0,0 +1,4 @@
+from myapp.settings import *  # noqa: F401,F403
+
+# A view over its query_budget fails the test instead of logging
+QUERY_BUDGET_MODE = "raise"
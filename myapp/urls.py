@@ -1,25 +1,13 @@
 from django.contrib import admin
 from django.urls import path, include
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
-from drf_yasg import openapi
 from django.http import JsonResponse
 from rest_framework import status
 from rest_framework.status import HTTP_404_NOT_FOUND, HTTP_500_INTERNAL_SERVER_ERROR
 
+from myapp.utils.imports import lazy_view
+from myapp.views import DatabasePoolStats, metrics
 from tenants.urls import tenant_urlpatterns, tenant_user_urlpatterns
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title = 'Snippets API',
-        default_version='v1',
-        description='Test description',
-        license=openapi.License(name="TOS")
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny,],
-)
-
 # Register custom handlers
 def custom_404_handler(request, exception):
     return JsonResponse({
@@ -46,8 +34,11 @@ handler500 = custom_500_handler
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('swagger/<format>', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('swagger', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-    path('users/', include('users.urls'))
+    # drf_yasg is imported by the first docs request, not by every worker at boot
+    path('swagger/<format>', lazy_view('myapp.configurations.openapi.schema_file'), name='schema-json'),
+    path('swagger', lazy_view('myapp.configurations.openapi.swagger_ui'), name='schema-swagger-ui'),
+    path('redoc', lazy_view('myapp.configurations.openapi.redoc_ui'), name='schema-redoc'),
+    path('users/', include('users.urls')),
+    path('health/db-pool', DatabasePoolStats.as_view(), name='db_pool_stats'),
+    path('metrics', metrics, name='metrics'),
 ]
@@ -0,0 +1,91 @@
+# cache.py
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+
+def _version_key(namespace):
+    return f"{namespace}:version"
+
+
+def namespace_version(namespace):
+    """
+    Current generation of a cache namespace, bumping it orphans every key built from it
+    """
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def versioned_key(namespace, *parts):
+    return ":".join([namespace, f"v{namespace_version(namespace)}", *map(str, parts)])
+
+
+async def anamespace_version(namespace):
+    """
+    Async twin of namespace_version, for code running on the event loop
+    """
+    key = _version_key(namespace)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, 1, timeout=None)
+        version = await cache.aget(key, 1)
+    return version
+
+
+async def aversioned_key(namespace, *parts):
+    return ":".join([namespace, f"v{await anamespace_version(namespace)}", *map(str, parts)])
+
+
+def bump_namespace(namespace):
+    key = _version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted, restart from a value no live key can have been built with
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+class LocalTTLCache:
+    """
+    Small in-process LRU whose entries also expire after `ttl` seconds.
+    Other processes cannot invalidate it, `ttl` bounds how stale it can get.
+    """
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -1,20 +1,109 @@
-import dotenv
-from dotenv import load_dotenv
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
 
-load_dotenv(verbose=True)
+from django.core.exceptions import ImproperlyConfigured
+from dotenv import dotenv_values
+
+# The project root, not the working directory, so gunicorn / celery started elsewhere read the same file
+ENV_FILE = Path(__file__).resolve().parent.parent.parent / ".env"
+
+TRUE_VALUES = {"1", "true", "yes", "on"}
+FALSE_VALUES = {"0", "false", "no", "off", ""}
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400}
+DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h|d)?\s*$")
+
+_missing = []
+
+
+@lru_cache(maxsize=None)
+def load_env(path=ENV_FILE):
+    """
+    .env parsed once, with process environment variables taking precedence.
+    Containers can run without the file at all.
+    """
+    values = {key: value for key, value in dotenv_values(path).items() if value is not None}
+    values.update(os.environ)
+    return values
+
+
+def to_bool(value):
+    lowered = value.strip().lower()
+    if lowered in TRUE_VALUES:
+        return True
+    if lowered in FALSE_VALUES:
+        return False
+    raise ValueError(f"{value!r} is not a boolean")
+
+
+def to_duration(value):
+    """
+    "300" / "300s" / "5m" / "2h" / "1d" / "250ms" -> seconds
+    """
+    match = DURATION_RE.match(value)
+    if match is None:
+        raise ValueError(f"{value!r} is not a duration")
+    seconds = float(match.group(1)) * DURATION_UNITS[match.group(2) or "s"]
+    return int(seconds) if seconds.is_integer() else seconds
+
+
+def fetch(key, cast=str, default=None, required=False):
+    """
+    Typed value of `key`, `default` when unset or empty.
+    Missing required keys are collected and reported together once EnvConstants is built.
+    """
+    value = load_env().get(key)
+    if value is None or value == "":
+        if required:
+            _missing.append(key)
+        return default
+    try:
+        return cast(value)
+    except ValueError as exc:
+        raise ImproperlyConfigured(f"{key}: {exc}") from exc
 
-def fetch(key):
-    return dotenv.get_key(".env", key)
 
 class EnvConstants:
-    secret_key = fetch("SECRET_KEY")
-    environment = fetch("ENVIRONMENT")
+    secret_key = fetch("SECRET_KEY", required=True)
+    environment = fetch("ENVIRONMENT", default="development")
+    async_views = fetch("ASYNC_VIEWS", to_bool, default=False)
+    query_budget_mode = fetch("QUERY_BUDGET_MODE", default="off")
     class Database:
-        name = fetch("POSTGRES_DB")
-        username = fetch("POSTGRES_USER")
+        name = fetch("POSTGRES_DB", required=True)
+        username = fetch("POSTGRES_USER", required=True)
         password = fetch("POSTGRES_PASSWORD")
-        host = fetch("DB_HOST")
-        port = fetch("DB_PORT")
+        host = fetch("DB_HOST", default="localhost")
+        port = fetch("DB_PORT", int, default=5432)
+        # None: 60 under WSGI, 0 with ASYNC_VIEWS (see settings.DATABASES)
+        conn_max_age = fetch("DB_CONN_MAX_AGE", to_duration)
+        conn_health_checks = fetch("DB_CONN_HEALTH_CHECKS", to_bool, default=True)
+        pool = fetch("DB_POOL", to_bool, default=False)
+        pool_min_size = fetch("DB_POOL_MIN_SIZE", int, default=2)
+        pool_max_size = fetch("DB_POOL_MAX_SIZE", int, default=10)
+        pool_timeout = fetch("DB_POOL_TIMEOUT", to_duration, default=10)
+    class Cache:
+        backend = fetch("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache")
+        location = fetch("CACHE_LOCATION", default="")
+        whoami_timeout = fetch("WHOAMI_CACHE_TIMEOUT", to_duration, default=300)
+    class Hashing:
+        executor = fetch("PASSWORD_HASHING_EXECUTOR")
+        max_workers = fetch("PASSWORD_HASHING_MAX_WORKERS", int, default=4)
+        max_queue = fetch("PASSWORD_HASHING_MAX_QUEUE", int, default=32)
+    class Logging:
+        queue = fetch("LOG_QUEUE", to_bool, default=False)
+        queue_size = fetch("LOG_QUEUE_SIZE", int, default=10000)
+        queue_policy = fetch("LOG_QUEUE_POLICY", default="drop")
+        file_mode = fetch("LOG_FILE_MODE", default="rotating")
+        format = fetch("LOG_FORMAT", default="text")
+        sampling = fetch("LOG_SAMPLING", default="")
+    class Metrics:
+        token = fetch("METRICS_TOKEN")
+        # Without a token /metrics answers 403 unless exposing it unauthenticated is explicitly wanted
+        public = fetch("METRICS_PUBLIC", to_bool, default=False)
+
 
+if _missing:
+    raise ImproperlyConfigured(f"Missing required environment keys: {', '.join(_missing)} (set them in {ENV_FILE} or the environment)")
 
-env = EnvConstants()
\ No newline at end of file
+env = EnvConstants()
@@ -0,0 +1,135 @@
+# hashing.py
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingPoolBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Server is busy, retry shortly."
+    default_code = "hashing_pool_busy"
+    # Sent as Retry-After by DRF's exception handler, a slot frees up within about one hash
+    wait = 1
+
+
+class PasswordHashingExecutor:
+    """
+    Bounded pool for the CPU-heavy password hasher.
+    - kind: "thread" (hashlib releases the GIL for PBKDF2) or "process"
+    - max_workers hashes run at once, at most max_queue more wait for a worker;
+      beyond that callers get HashingPoolBusy (503) instead of piling up
+    - a hash still unfinished after `timeout` seconds is also HashingPoolBusy
+    - sync callers wait up to queue_timeout for a slot, async callers never block the loop
+    """
+
+    def __init__(self, kind="thread", max_workers=4, max_queue=32, queue_timeout=0.1, timeout=10.0):
+        if kind == "process":
+            self._pool = ProcessPoolExecutor(max_workers=max_workers, initializer=django.setup)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hasher")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+
+    def _submit(self, block, fn, *args):
+        acquired = self._slots.acquire(timeout=self.queue_timeout) if block else self._slots.acquire(blocking=False)
+        if not acquired:
+            raise HashingPoolBusy()
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn, *args):
+        future = self._submit(True, fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Frees the slot now if the hash never left the queue, a running one frees it when done
+            future.cancel()
+            raise HashingPoolBusy()
+
+    async def arun(self, fn, *args):
+        try:
+            # wait_for cancels the wrapped future on timeout, like run() does
+            return await asyncio.wait_for(asyncio.wrap_future(self._submit(False, fn, *args)), self.timeout)
+        except TimeoutError:
+            raise HashingPoolBusy()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    The process-wide executor from settings.PASSWORD_HASHING_EXECUTOR, None when hashing stays inline
+    """
+    global _executor
+    config = settings.PASSWORD_HASHING_EXECUTOR
+    if not config.get("KIND"):
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = PasswordHashingExecutor(
+                    kind=config["KIND"],
+                    max_workers=config.get("MAX_WORKERS", 4),
+                    max_queue=config.get("MAX_QUEUE", 32),
+                    queue_timeout=config.get("QUEUE_TIMEOUT", 0.1),
+                    timeout=config.get("TIMEOUT", 10.0),
+                )
+    return _executor
+
+
+def make_password(password):
+    executor = get_executor()
+    # None means an unusable password, nothing to hash
+    if executor is None or password is None:
+        return hashers.make_password(password)
+    return executor.run(hashers.make_password, password)
+
+
+def check_password(password, encoded, setter=None):
+    """
+    Same contract as django.contrib.auth.hashers.check_password, with the hash in the pool
+    """
+    executor = get_executor()
+    if executor is None:
+        return hashers.check_password(password, encoded, setter)
+
+    is_correct, must_update = executor.run(hashers.verify_password, password, encoded)
+    if setter and is_correct and must_update:
+        setter(password)
+    return is_correct
+
+
+async def acheck_password(password, encoded, setter=None):
+    executor = get_executor()
+    if executor is None:
+        return await hashers.acheck_password(password, encoded, setter)
+
+    is_correct, must_update = await executor.arun(hashers.verify_password, password, encoded)
+    if setter and is_correct and must_update:
+        await setter(password)
+    return is_correct
+
+
+async def amake_password(password):
+    executor = get_executor()
+    if executor is None or password is None:
+        return await sync_to_async(hashers.make_password, thread_sensitive=False)(password)
+    return await executor.arun(hashers.make_password, password)
@@ -0,0 +1,20 @@
+from django.utils.module_loading import import_string
+
+
+def lazy_view(dotted_path):
+    """
+    URLconf entry for a view whose module is only imported on its first request,
+    for docs and tooling views that pull in heavy dependencies.
+    """
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path)
+        return view(request, *args, **kwargs)
+
+    module, _, name = dotted_path.rpartition(".")
+    wrapper.__module__ = module
+    wrapper.__name__ = wrapper.__qualname__ = name
+    return wrapper
@@ -3,6 +3,28 @@ from typing import Union
 
 from rest_framework.response import Response
 
+
+class EnvelopeResponse(Response):
+    """
+    Response whose body is already split into the envelope parts.
+    ApiWrapperRenderer encodes `message` and `data` straight into the wrapper,
+    `data` is referenced as-is, never copied or mutated.
+    - message: None falls back to the renderer's default for the status code
+    """
+
+    def __init__(self, message, data, status=200, **kwargs):
+        super().__init__(data, status=status, **kwargs)
+        self.message = message
+
+
+def _split_legacy_payload(message: str, payload: dict):
+    # Payloads carrying their own "detail"/"message" keys keep the old merge-then-pop output
+    body = dict(payload)
+    body["message"] = message
+    message = body.pop("detail") if "detail" in body else body.pop("message")
+    return message, body.pop("data", body)
+
+
 def success(message: str, payload=None, status=200):
     """
     Return a success response.
@@ -11,16 +33,20 @@ def success(message: str, payload=None, status=200):
     - status: HTTP status code
     """
 
-    if payload is not None:
-        # If payload is a dict, merge its fields into body
-        if isinstance(payload, dict):
-            payload["message"] = message
-        elif isinstance(payload, list):
-            payload = {"message": message, "data":payload}
-    else:
-        payload = {"message": message, "data": {}}
+    if payload is None:
+        return EnvelopeResponse(message, {}, status=status)
+
+    if isinstance(payload, dict):
+        # A dict payload is the envelope's data, or its "data" key when present
+        if "detail" in payload or "message" in payload:
+            message, payload = _split_legacy_payload(message, payload)
+        elif "data" in payload:
+            payload = payload["data"]
+    elif not isinstance(payload, list):
+        # Scalars are the data as they are, falsy ones (0, "", False) included
+        message, payload = None, payload
 
-    return Response(payload, status=status)
+    return EnvelopeResponse(message, payload, status=status)
 
 def error(message: str="An error occurred", details:Union[dict,list,str]=None, status:int=400):
     """
@@ -28,16 +54,11 @@ def error(message: str="An error occurred", details:Union[dict,list,str]=None, s
     - message: string
     - details: any JSON-serializable data to go into the wrapper's "data" field
     """
-    body = {'message': message}
-
-    body['data'] = details or {}
-
-
-    return Response(body, status=status)
+    return EnvelopeResponse(message, details or {}, status=status)
 
 # Optional: Shortcuts
 def created(data=None, message="Resource created"):
-    return success(data, message, status=201)
+    return success(message, data, status=201)
 
 def no_content():
-    return Response(status=204)
\ No newline at end of file
+    return Response(status=204)
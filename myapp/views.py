@@ -0,0 +1,88 @@
+import hmac
+import os
+
+from django.db import connections
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.views import APIView
+
+from myapp.configurations import metrics as metrics_config
+from myapp.configurations.yasg_wrapper import swagger_response
+from myapp.permissions.core_roles import IsSuperAdmin
+from myapp.utils.env_constants import env
+from myapp.utils.responses import success
+
+
+class DatabasePoolStats(APIView):
+    """
+    Connection settings and pool statistics of the worker process that served the request.
+    Pools are per process, so compare `pid` across a few calls when sizing against the worker count.
+    """
+
+    permission_classes = [IsSuperAdmin]
+
+    @staticmethod
+    def alias_stats(connection):
+        stats = {
+            "vendor": connection.vendor,
+            "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+            "conn_health_checks": connection.settings_dict["CONN_HEALTH_CHECKS"],
+            "pooled": False,
+        }
+        pool = getattr(connection, "pool", None)
+        if pool is not None:
+            stats.update(
+                pooled=True,
+                min_size=pool.min_size,
+                max_size=pool.max_size,
+                timeout=pool.timeout,
+                # pool_size, pool_available, requests_waiting, requests_num, connections_num, ...
+                stats=pool.get_stats(),
+            )
+        return stats
+
+    @swagger_response(
+        input_serializer=None,
+        output_serializer=None,
+        responses={
+            status.HTTP_200_OK: {
+                "desc": "Pool statistics of this worker",
+                "message": "Database pool stats",
+            }
+        },
+    )
+    def get(self, request):
+        data = {
+            "pid": os.getpid(),
+            "databases": {alias: self.alias_stats(connections[alias]) for alias in connections},
+        }
+        return success("Database pool stats", data, status.HTTP_200_OK)
+
+
+def metrics(request):
+    """
+    Prometheus text exposition, merged across worker processes in multiprocess mode.
+    Plain Django view, scrapers want the raw format and not the API envelope.
+    """
+    if metrics_config.prometheus_client is None:
+        return HttpResponse("prometheus_client is not installed\n", status=503, content_type="text/plain")
+
+    if env.Metrics.token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        # As bytes, compare_digest refuses str with non-ASCII characters
+        if not hmac.compare_digest(supplied.encode(), env.Metrics.token.encode()):
+            return HttpResponse(status=401)
+    elif not env.Metrics.public:
+        return HttpResponse(
+            "Set METRICS_TOKEN, or METRICS_PUBLIC=true to serve metrics without one\n",
+            status=403,
+            content_type="text/plain",
+        )
+
+    # This process's pending observations, the other workers flush on their own timer
+    metrics_config.view_metrics.flush()
+    prometheus_client = metrics_config.prometheus_client
+    return HttpResponse(
+        prometheus_client.generate_latest(metrics_config.registry()),
+        content_type=prometheus_client.CONTENT_TYPE_LATEST,
+    )
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from myapp.enums.application_role_names import PermissionEnum
+        from users import signals  # noqa: F401
+
+        PermissionEnum.load()
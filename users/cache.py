@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from myapp.configurations.conditional import make_etag
+from myapp.utils.cache import aversioned_key, bump_namespace, versioned_key
+
+WHOAMI_NAMESPACE = "whoami"
+
+
+def whoami_cache_key(user_id):
+    return versioned_key(WHOAMI_NAMESPACE, user_id)
+
+
+async def awhoami_cache_key(user_id):
+    return await aversioned_key(WHOAMI_NAMESPACE, user_id)
+
+
+def get_cached_profile(user_id, build):
+    """
+    Return (etag, payload) of a user's WhoAmI profile, calling `build()` on a miss.
+    The ETag is computed once when the payload is built, so conditional requests
+    never serialize anything.
+    """
+    key = whoami_cache_key(user_id)
+    entry = cache.get(key)
+    if entry is None:
+        payload = build()
+        entry = (make_etag(user_id, payload), payload)
+        cache.set(key, entry, timeout=settings.WHOAMI_CACHE_TIMEOUT)
+    return entry
+
+
+async def aget_cached_profile(user_id, abuild):
+    """
+    Async twin of get_cached_profile, `abuild()` is awaited on a miss
+    """
+    key = await awhoami_cache_key(user_id)
+    entry = await cache.aget(key)
+    if entry is None:
+        payload = await abuild()
+        entry = (make_etag(user_id, payload), payload)
+        await cache.aset(key, entry, timeout=settings.WHOAMI_CACHE_TIMEOUT)
+    return entry
+
+
+def invalidate_profile(user_id):
+    cache.delete(whoami_cache_key(user_id))
+
+
+def invalidate_all_profiles():
+    bump_namespace(WHOAMI_NAMESPACE)
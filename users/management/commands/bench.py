@@ -0,0 +1,253 @@
+import itertools
+import json
+import platform
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import Client, override_settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from users import urls as users_urls
+from users.management.commands.create_users import DEFAULT_PASSWORD
+from users.models import User
+
+SUPERUSER = "bench_admin"
+REGULAR_USER = "bench_user"
+
+
+@dataclass
+class Scenario:
+    """
+    One request against a users.urls route.
+    - user: client logged in as this user before timing starts, None for anonymous
+    - prepare: run before every request, outside the timing (e.g. log back in before logout)
+    """
+
+    name: str
+    method: str
+    user: str | None = None
+    data: object = None
+    prepare: object = None
+
+    def payload(self, n):
+        return self.data(n) if callable(self.data) else self.data
+
+
+def register_payload(n):
+    return {
+        "username": f"bench_new_{n}",
+        "email": f"bench_new_{n}@example.com",
+        "password": DEFAULT_PASSWORD,
+        "first_name": "Bench",
+        "last_name": "User",
+    }
+
+
+# Keyed by URL name, every route of users.urls needs one
+SCENARIOS = {
+    "get_csrf_token": Scenario("get_csrf_token", "get"),
+    "register_user": Scenario("register_user", "post", data=register_payload),
+    "login_user": Scenario("login_user", "post", data={"username": REGULAR_USER, "password": DEFAULT_PASSWORD}),
+    "logout_user": Scenario(
+        "logout_user", "get", user=REGULAR_USER,
+        prepare=lambda client: client.force_login(User.objects.get(username=REGULAR_USER)),
+    ),
+    "who_am_i": Scenario("who_am_i", "get", user=REGULAR_USER),
+    "fetch_all_users": Scenario("fetch_all_users", "get", user=SUPERUSER),
+    "search_users": Scenario("search_users", "get", user=SUPERUSER, data={"q": "joh"}),
+    "export_users": Scenario("export_users", "get", user=SUPERUSER),
+}
+
+
+def percentile(values, pct):
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+class Command(BaseCommand):
+    help = "Benchmark every users endpoint on a throwaway database, optionally against a saved baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000, help="Users seeded before the run")
+        parser.add_argument("--requests", type=int, default=200, help="Timed requests per endpoint")
+        parser.add_argument("--concurrency", type=int, default=8, help="Client threads per endpoint")
+        parser.add_argument("--seed", type=int, default=42, help="Seed for the generated users")
+        parser.add_argument("--endpoint", action="append", help="Only run these URL names (repeatable)")
+        parser.add_argument("--output", help="Write the results to this JSON baseline file")
+        parser.add_argument("--compare", help="Baseline JSON to compare against, exits 1 on regression")
+        parser.add_argument(
+            "--threshold", type=float, default=20.0,
+            help="Allowed slowdown in percent for p95 and throughput before it counts as a regression",
+        )
+
+    def handle(self, *args, **options):
+        names = options["endpoint"] or [pattern.name for pattern in users_urls.urlpatterns]
+        missing = [name for name in names if name not in SCENARIOS]
+        if missing:
+            raise CommandError(f"No bench scenario for: {', '.join(missing)}")
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive")
+        if connection.vendor == "sqlite" and options["concurrency"] > 1:
+            # The in-memory test database locks whole tables, concurrent writers fail instead of waiting
+            self.stdout.write(self.style.WARNING("SQLite test database, running with --concurrency 1"))
+            options["concurrency"] = 1
+
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            # Throttling would turn the login and register runs into a 429 benchmark
+            rest_framework = {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}}
+            with override_settings(REST_FRAMEWORK=rest_framework):
+                self.seed(options)
+                results = {name: self.run_scenario(SCENARIOS[name], options) for name in names}
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        report = {
+            "meta": {
+                "users": options["users"],
+                "requests": options["requests"],
+                "concurrency": options["concurrency"],
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+            },
+            "endpoints": results,
+        }
+        self.print_report(results)
+
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['output']}"))
+
+        if options["compare"]:
+            self.compare(results, options["compare"], options["threshold"])
+
+    def seed(self, options):
+        call_command("create_users", count=options["users"], seed=options["seed"], verbosity=0, stdout=self.stdout)
+        User.objects.create_superuser(username=SUPERUSER, password=DEFAULT_PASSWORD)
+        User.objects.create_user(username=REGULAR_USER, password=DEFAULT_PASSWORD)
+
+    def client_for(self, scenario):
+        client = Client()
+        if scenario.user:
+            client.force_login(User.objects.get(username=scenario.user))
+        return client
+
+    def timed_request(self, client, scenario, url, n):
+        if scenario.prepare:
+            scenario.prepare(client)
+
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            start = time.perf_counter()
+            response = getattr(client, scenario.method)(url, scenario.payload(n))
+            if response.streaming:
+                b"".join(response.streaming_content)
+            elapsed = time.perf_counter() - start
+
+        if response.status_code >= 400:
+            raise CommandError(f"{scenario.name} answered {response.status_code}: {response.content[:200]!r}")
+        return elapsed, queries
+
+    def run_scenario(self, scenario, options):
+        url = reverse(scenario.name)
+        counter = itertools.count()
+        local = threading.local()
+        thread_connections = []
+
+        def one(_):
+            if not hasattr(local, "client"):
+                local.client = self.client_for(scenario)
+                thread_connections.append(connections[DEFAULT_DB_ALIAS])
+            return self.timed_request(local.client, scenario, url, next(counter))
+
+        # Warm up caches and code paths outside the measurement
+        client = self.client_for(scenario)
+        for _ in range(min(10, options["requests"])):
+            self.timed_request(client, scenario, url, next(counter))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            samples = list(pool.map(one, range(options["requests"])))
+        wall = time.perf_counter() - start
+
+        # Every pool thread opened its own connection, close them before the test database is dropped
+        for thread_connection in thread_connections:
+            thread_connection.inc_thread_sharing()
+            thread_connection.close()
+
+        latencies = [elapsed for elapsed, _ in samples]
+        queries = [count for _, count in samples]
+
+        # Allocations are measured sequentially, tracemalloc would distort the timings above
+        allocations = []
+        for _ in range(min(5, options["requests"])):
+            tracemalloc.start()
+            self.timed_request(client, scenario, url, next(counter))
+            allocations.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        return {
+            "rps": round(len(samples) / wall, 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+            "queries": round(statistics.mean(queries), 2),
+            "peak_alloc_kb": round(statistics.median(allocations) / 1024, 1),
+        }
+
+    def print_report(self, results):
+        self.stdout.write(
+            f"{'endpoint':<18}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'alloc kb':>10}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<18}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                f"{result['p99_ms']:>10.2f}{result['queries']:>9.1f}{result['peak_alloc_kb']:>10.1f}"
+            )
+
+    def compare(self, results, path, threshold):
+        with open(path) as handle:
+            baseline = json.load(handle)["endpoints"]
+
+        allowed = threshold / 100
+        regressions = []
+        for name, result in results.items():
+            base = baseline.get(name)
+            if base is None:
+                continue
+            if result["p95_ms"] > base["p95_ms"] * (1 + allowed):
+                regressions.append(f"{name}: p95 {base['p95_ms']} -> {result['p95_ms']} ms")
+            if result["rps"] < base["rps"] * (1 - allowed):
+                regressions.append(f"{name}: throughput {base['rps']} -> {result['rps']} req/s")
+            # Query counts are deterministic, any increase is a regression
+            if result["queries"] > base["queries"]:
+                regressions.append(f"{name}: queries {base['queries']} -> {result['queries']}")
+
+        if regressions:
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(line))
+            raise CommandError(f"{len(regressions)} performance regression(s) against {path}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {path} (threshold {threshold:.0f}%)"))
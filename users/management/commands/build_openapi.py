@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from myapp.configurations.openapi import FORMATS, encode_schema, generate_schema
+
+
+class Command(BaseCommand):
+    help = "Write the OpenAPI schema to JSON and YAML files served by /swagger/.json and /swagger/.yaml"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir",
+            default=None,
+            help="Directory for schema.json / schema.yaml (default: settings.OPENAPI_SCHEMA_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        output_dir = Path(options["output_dir"] or settings.OPENAPI_SCHEMA_DIR)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        schema = generate_schema()
+        for output, (filename, _, _) in FORMATS.items():
+            content = encode_schema(schema, output)
+            (output_dir / filename).write_bytes(content)
+            self.stdout.write(f"Wrote {output_dir / filename} ({len(content)} bytes)")
+
+        self.stdout.write(self.style.SUCCESS("OpenAPI schema built"))
@@ -0,0 +1,80 @@
+import math
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand, CommandError
+
+# Work factor attribute of each hasher family and whether it scales linearly or as a power of two
+WORK_FACTORS = {
+    'pbkdf2_sha256': ('iterations', 'linear'),
+    'pbkdf2_sha1': ('iterations', 'linear'),
+    'argon2': ('time_cost', 'linear'),
+    'bcrypt_sha256': ('rounds', 'log2'),
+    'bcrypt': ('rounds', 'log2'),
+    'scrypt': ('work_factor', 'pow2'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Time the configured password hashers on this machine and recommend work factors for a target latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=250.0, help='Wanted time per hash in milliseconds')
+        parser.add_argument('--samples', type=int, default=5, help='Hashes timed per hasher')
+
+    def handle(self, *args, **options):
+        target = options['target_ms'] / 1000
+        samples = options['samples']
+        if target <= 0 or samples < 1:
+            raise CommandError("--target-ms and --samples must be positive")
+
+        workers = settings.PASSWORD_HASHING_EXECUTOR.get('MAX_WORKERS') or os.cpu_count()
+
+        for hasher in get_hashers():
+            factor = WORK_FACTORS.get(hasher.algorithm)
+            if factor is None:
+                self.stdout.write(self.style.WARNING(f"{hasher.algorithm}: no known work factor, skipped"))
+                continue
+            try:
+                if hasher.library:
+                    hasher._load_library()
+            except ValueError:
+                self.stdout.write(self.style.WARNING(f"{hasher.algorithm}: library not installed, skipped"))
+                continue
+
+            attribute, scale = factor
+            current = getattr(hasher, attribute)
+            elapsed = self.time_hasher(hasher, samples)
+            recommended = self.scale(current, scale, target / elapsed)
+
+            self.stdout.write(
+                f"{hasher.algorithm}: {attribute}={current} takes {elapsed * 1000:.1f} ms "
+                f"(~{workers / elapsed:.0f} logins/s on {workers} hashing workers)"
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"  {attribute}={recommended} for ~{options['target_ms']:.0f} ms, "
+                f"subclass {hasher.__class__.__name__} and list it first in PASSWORD_HASHERS"
+            ))
+
+    @staticmethod
+    def time_hasher(hasher, samples):
+        salt = hasher.salt()
+        hasher.encode('calibration-password', salt)  # warm up
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            hasher.encode('calibration-password', salt)
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings)
+
+    @staticmethod
+    def scale(current, scale, ratio):
+        if scale == 'linear':
+            return max(1, round(current * ratio))
+        # rounds is log2 of the cost, work_factor is the cost itself as a power of two
+        if scale == 'log2':
+            return max(4, current + round(math.log2(ratio)))
+        return max(2, 2 ** round(math.log2(current * ratio)))
@@ -1,25 +1,132 @@
-from django.core.management.base import BaseCommand
-from faker import Faker
+import csv
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from users.management.seed_data import build_user_rows
 from users.models import User
 
+DEFAULT_PASSWORD = "#TestUsers123"
+
+COPY_FIELDS = [
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "password",
+    "is_superuser",
+    "is_staff",
+    "is_active",
+    "date_joined",
+    "created_at",
+    "updated_at",
+]
+
+
 class Command(BaseCommand):
     help = 'Create a set of users'
 
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=10, help="Number of users to create")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per insert")
+        parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible data")
+        parser.add_argument("--workers", type=int, default=1, help="Processes generating fake data")
+        parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password for every user")
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Load rows with PostgreSQL COPY instead of bulk_create",
+        )
+
     def handle(self, *args, **options):
-        faker = Faker()
+        number_of_users = options["count"]
+        batch_size = options["batch_size"]
+        if number_of_users < 1 or batch_size < 1:
+            raise CommandError("--count and --batch-size must be positive")
+        if options["copy"] and connection.vendor != "postgresql":
+            raise CommandError("--copy is only available on PostgreSQL")
+
+        # Hash once, every seeded user shares the same password
+        password = make_password(options["password"])
+
+        # Number rows after the current max id, soft-deleted rows included, so reruns do not collide
+        offset = (User.all_objects.aggregate(last=Max("id"))["last"] or 0) + 1
+        insert = self.copy_batch if options["copy"] else self.bulk_create_batch
 
-        # Create users
-        number_of_users = 10
+        created = 0
+        for rows in self.generate(offset, number_of_users, batch_size, options["seed"], options["workers"]):
+            with transaction.atomic():
+                insert(rows, password)
+            created += len(rows)
 
-        for i in range(number_of_users):
-            user = User.objects.create_user(
-                username = faker.user_name(),
-                email = faker.email(),
-                password = "#TestUsers123",
-                first_name = faker.first_name(),
-                last_name = faker.last_name(),
-            )
-            self.stdout.write(self.style.SUCCESS(f"Created user username: {user.username} email: {user.email}"))
+            if options["verbosity"] >= 2:
+                for username, email, *_ in rows:
+                    self.stdout.write(self.style.SUCCESS(f"Created user username: {username} email: {email}"))
+            self.stdout.write(f"Inserted {created}/{number_of_users} users")
 
         message = self.style.SUCCESS(f"Successfully created {number_of_users} users")
-        self.stdout.write(message)
\ No newline at end of file
+        self.stdout.write(message)
+
+    def generate(self, offset, count, batch_size, seed, workers):
+        batches = [
+            (start, min(batch_size, offset + count - start))
+            for start in range(offset, offset + count, batch_size)
+        ]
+
+        if workers <= 1:
+            for start, size in batches:
+                yield build_user_rows(seed, start, size)
+            return
+
+        # Keep at most two batches per worker in flight so memory stays bounded
+        window = workers * 2
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = [executor.submit(build_user_rows, seed, *batch) for batch in batches[:window]]
+            queued = len(pending)
+            while pending:
+                rows = pending.pop(0).result()
+                if queued < len(batches):
+                    pending.append(executor.submit(build_user_rows, seed, *batches[queued]))
+                    queued += 1
+                yield rows
+
+    def bulk_create_batch(self, rows, password):
+        User.objects.bulk_create(
+            [
+                User(
+                    username=username,
+                    email=email,
+                    first_name=first_name,
+                    last_name=last_name,
+                    password=password,
+                )
+                for username, email, first_name, last_name in rows
+            ]
+        )
+
+    def copy_batch(self, rows, password):
+        now = timezone.now().isoformat()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for username, email, first_name, last_name in rows:
+            writer.writerow([username, email, first_name, last_name, password, "f", "f", "t", now, now, now])
+        buffer.seek(0)
+
+        columns = ", ".join(
+            connection.ops.quote_name(User._meta.get_field(name).column) for name in COPY_FIELDS
+        )
+        sql = f"COPY {connection.ops.quote_name(User._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+        with connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, "copy_expert"):
+                # psycopg2
+                raw.copy_expert(sql, buffer)
+            else:
+                # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
@@ -0,0 +1,108 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker does before its first request: build the WSGI handler (settings, apps, middleware)
+# and load the URLconf with every view module
+BOOT = """
+import time
+start = time.perf_counter()
+from myapp.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(f"boot_us={(time.perf_counter() - start) * 1e6:.0f}")
+"""
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)$")
+
+
+def parse_importtime(stderr):
+    """
+    [(module, self_us, cumulative_us)] from the `-X importtime` report
+    """
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, module = match.groups()
+            modules.append((module, int(self_us), int(cumulative_us)))
+    return modules
+
+
+class Command(BaseCommand):
+    help = "Profile worker boot with `python -X importtime` and check the boot time against a budget"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=15, help="Slowest modules and packages to list")
+        parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to boot, the median counts")
+        parser.add_argument(
+            "--budget-file",
+            default=os.path.join(settings.BASE_DIR, "import_budget.json"),
+            help="JSON file with the allowed boot time, {\"boot_ms\": ...}",
+        )
+        parser.add_argument(
+            "--update-budget", action="store_true",
+            help="Write the measured boot time plus --headroom to the budget file instead of checking it",
+        )
+        parser.add_argument("--headroom", type=float, default=25.0, help="Percent added by --update-budget")
+
+    def boot(self):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", BOOT],
+            env=env, capture_output=True, text=True, cwd=settings.BASE_DIR,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Boot failed:\n{result.stderr[-2000:]}")
+        boot_us = int(result.stdout.strip().splitlines()[-1].removeprefix("boot_us="))
+        return boot_us / 1000, parse_importtime(result.stderr)
+
+    def handle(self, *args, **options):
+        if options["runs"] < 1:
+            raise CommandError("--runs must be positive")
+
+        runs = [self.boot() for _ in range(options["runs"])]
+        boot_ms = statistics.median(boot for boot, _ in runs)
+        # The module breakdown of the fastest run, the least disturbed by the machine
+        modules = min(runs, key=lambda run: run[0])[1]
+
+        self.print_report(modules, options["top"])
+        self.stdout.write(f"Boot time {boot_ms:.0f} ms (median of {options['runs']}, with importtime overhead)")
+
+        path = options["budget_file"]
+        if options["update_budget"]:
+            budget_ms = round(boot_ms * (1 + options["headroom"] / 100))
+            with open(path, "w") as handle:
+                json.dump({"boot_ms": budget_ms}, handle, indent=2)
+                handle.write("\n")
+            self.stdout.write(self.style.SUCCESS(f"Budget of {budget_ms} ms written to {path}"))
+            return
+
+        if not os.path.exists(path):
+            self.stdout.write(self.style.WARNING(f"No budget at {path}, create it with --update-budget"))
+            return
+        with open(path) as handle:
+            budget_ms = json.load(handle)["boot_ms"]
+        if boot_ms > budget_ms:
+            raise CommandError(f"Boot time {boot_ms:.0f} ms is over the {budget_ms} ms budget in {path}")
+        self.stdout.write(self.style.SUCCESS(f"Within the {budget_ms} ms budget"))
+
+    def print_report(self, modules, top):
+        packages = defaultdict(int)
+        for module, self_us, _ in modules:
+            packages[module.partition(".")[0]] += self_us
+
+        self.stdout.write(f"{'package':<40}{'self ms':>10}")
+        for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+            self.stdout.write(f"{package:<40}{self_us / 1000:>10.1f}")
+
+        self.stdout.write(f"\n{'module':<40}{'self ms':>10}{'cumulative ms':>15}")
+        for module, self_us, cumulative_us in sorted(modules, key=lambda item: item[1], reverse=True)[:top]:
+            self.stdout.write(f"{module:<40}{self_us / 1000:>10.1f}{cumulative_us / 1000:>15.1f}")
@@ -0,0 +1,61 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from myapp.utils.env_constants import to_duration
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Hard-delete users soft-deleted longer than --older-than ago, in small throttled batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than", default="30d",
+            help="Minimum time since the soft delete, e.g. 30d, 12h (default: 30d)",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per delete transaction")
+        parser.add_argument(
+            "--sleep", default="500ms",
+            help="Pause between batches so replicas and autovacuum keep up (default: 500ms)",
+        )
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches")
+        parser.add_argument("--dry-run", action="store_true", help="Only count what would be purged")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+        try:
+            older_than = to_duration(str(options["older_than"]))
+            pause = to_duration(str(options["sleep"]))
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        cutoff = timezone.now() - timedelta(seconds=older_than)
+        expired = User.all_objects.filter(deleted_at__lt=cutoff)
+
+        if options["dry_run"]:
+            self.stdout.write(f"{expired.count()} users soft-deleted before {cutoff:%Y-%m-%d %H:%M} would be purged")
+            return
+
+        purged = batches = 0
+        while options["max_batches"] is None or batches < options["max_batches"]:
+            # Oldest first over users_deleted_at_idx, each batch locks at most batch_size rows for one short transaction
+            ids = list(expired.order_by("deleted_at", "pk").values_list("pk", flat=True)[: options["batch_size"]])
+            if not ids:
+                break
+            with transaction.atomic():
+                # Cascades to the rows that reference the user (group and permission links, admin log entries)
+                _, deleted = User.all_objects.filter(pk__in=ids).hard_delete()
+            purged += deleted.get(User._meta.label, 0)
+            batches += 1
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Batch {batches}: purged {len(ids)} users")
+            if len(ids) < options["batch_size"]:
+                break
+            time.sleep(pause)
+
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} users in {batches} batches"))
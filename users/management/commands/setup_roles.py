@@ -1,6 +1,10 @@
 from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import Group, ContentType, Permission
 from django.apps import apps
+from django.db import transaction
+
+from myapp.permissions.codenames import invalidate_all_codenames
+from users.cache import invalidate_all_profiles
 
 
 GROUP_PERMISSIONS = {
@@ -16,35 +20,116 @@ TENANT_APPS = ['users', 'conferences', 'tenants']
 class Command(BaseCommand):
     help = 'Set up default groups and assign permissions dynamically'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the changes without writing them',
+        )
+
     def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        with transaction.atomic():
+            self.sync(dry_run)
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING("Dry run, no changes were written"))
+            return
+
+        self.stdout.write(self.style.SUCCESS("🎉 Successfully set up dynamic roles and permissions"))
+
+    def sync(self, dry_run):
+        # Collect every model of the tenant apps that are installed
+        models_by_app = {}
+        for app in TENANT_APPS:
+            try:
+                models_by_app[app] = list(apps.get_app_config(app).get_models())
+            except LookupError:
+                self.stdout.write(self.style.WARNING(f"App {app} not found"))
+
+        # One query for every permission the groups may hold, keyed by (app_label, codename)
+        permission_ids = {
+            (app_label, codename): pk
+            for pk, app_label, codename in Permission.objects.filter(
+                content_type__app_label__in=models_by_app
+            ).values_list('id', 'content_type__app_label', 'codename')
+        }
+
+        groups = self.get_or_create_groups(dry_run)
+
+        desired = set()
         for group_name, perms in GROUP_PERMISSIONS.items():
-            group, created = Group.objects.get_or_create(name=group_name)
-            if created:
-                self.stdout.write(f"✅ Created group: {group_name}")
-
-            # Get all models from tenant apps
-            for app in TENANT_APPS:
-                try:
-                    app_config = apps.get_app_config(app)
-
-                    for model in app_config.get_models():
-                        for perm in perms:
-                            codename = f"{perm}_{model._meta.model_name}"
-                            try:
-                                permission = Permission.objects.get(
-                                    content_type__app_label=app,
-                                    codename=codename
-                                )
-                                group.permissions.add(permission)
-                            except Permission.DoesNotExist:
-                                self.stdout.write(
-                                    self.style.WARNING(
-                                        f"⚠️ Permission {codename} not found (maybe not migrated?)"
-                                    )
+            for app, models in models_by_app.items():
+                for model in models:
+                    for perm in perms:
+                        codename = f"{perm}_{model._meta.model_name}"
+                        pk = permission_ids.get((app, codename))
+                        if pk is None:
+                            self.stdout.write(
+                                self.style.WARNING(
+                                    f"⚠️ Permission {codename} not found (maybe not migrated?)"
                                 )
-                except LookupError:
-                    self.stdout.write(
-                        self.style.WARNING(f"App {app} not found")
-                    )
+                            )
+                            continue
+                        desired.add((group_name, pk))
+
+        # Only permissions of the tenant apps are managed, anything else on the group is left alone
+        through = Group.permissions.through
+        group_names = {group.pk: name for name, group in groups.items() if group.pk}
+        current_rows = {
+            (group_names[group_id], permission_id): row_id
+            for row_id, group_id, permission_id in through.objects.filter(
+                group_id__in=group_names,
+                permission_id__in=permission_ids.values(),
+            ).values_list('id', 'group_id', 'permission_id')
+        }
+
+        to_add = desired - current_rows.keys()
+        to_remove = current_rows.keys() - desired
+
+        self.report(permission_ids, to_add, to_remove)
+
+        if dry_run:
+            return
+
+        if to_remove:
+            through.objects.filter(id__in=[current_rows[key] for key in to_remove]).delete()
+        if to_add:
+            through.objects.bulk_create(
+                [through(group_id=groups[name].pk, permission_id=pk) for name, pk in to_add]
+            )
+        if to_add or to_remove:
+            # Writes on the through model skip m2m_changed, so the signal receivers never see them
+            transaction.on_commit(invalidate_all_codenames)
+            transaction.on_commit(invalidate_all_profiles)
+
+    def get_or_create_groups(self, dry_run):
+        groups = {group.name: group for group in Group.objects.filter(name__in=GROUP_PERMISSIONS)}
+
+        missing = [Group(name=name) for name in GROUP_PERMISSIONS if name not in groups]
+        if missing and not dry_run:
+            Group.objects.bulk_create(missing)
+            # bulk_create only sets primary keys on some backends
+            groups = {group.name: group for group in Group.objects.filter(name__in=GROUP_PERMISSIONS)}
+        else:
+            groups.update({group.name: group for group in missing})
+
+        for group in missing:
+            self.stdout.write(f"✅ Created group: {group.name}")
+        return groups
+
+    def report(self, permission_ids, to_add, to_remove):
+        codenames = {pk: f"{app_label}.{codename}" for (app_label, codename), pk in permission_ids.items()}
 
-        self.stdout.write(self.style.SUCCESS("🎉 Successfully set up dynamic roles and permissions"))
\ No newline at end of file
+        for group_name in GROUP_PERMISSIONS:
+            added = sorted(codenames[pk] for name, pk in to_add if name == group_name)
+            removed = sorted(codenames[pk] for name, pk in to_remove if name == group_name)
+            if not added and not removed:
+                self.stdout.write(f"{group_name}: up to date")
+                continue
+            self.stdout.write(f"{group_name}: +{len(added)} -{len(removed)}")
+            for codename in added:
+                self.stdout.write(self.style.SUCCESS(f"  + {codename}"))
+            for codename in removed:
+                self.stdout.write(self.style.WARNING(f"  - {codename}"))
@@ -0,0 +1,25 @@
+from faker import Faker
+
+
+def build_user_rows(seed, start, count):
+    """
+    Generate `count` fake user rows numbered from `start`.
+    - Kept free of Django imports so it can run in a process pool worker
+    - The row number is baked into username and email so they stay unique
+    - With a seed, a batch always produces the same rows whatever the worker count
+    """
+    faker = Faker()
+    if seed is not None:
+        faker.seed_instance(seed + start)
+
+    rows = []
+    for number in range(start, start + count):
+        rows.append(
+            (
+                f"{faker.user_name()}_{number}",
+                f"{faker.user_name()}.{number}@{faker.free_email_domain()}",
+                faker.first_name(),
+                faker.last_name(),
+            )
+        )
+    return rows
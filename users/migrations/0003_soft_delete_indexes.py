@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:37
+
+import myapp.utils.migrations
+import users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The indexes are built CONCURRENTLY on PostgreSQL, which can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0002_alter_user_managers'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', users.models.UserManager()),
+                ('all_objects', users.models.AllUsersManager()),
+            ],
+        ),
+        myapp.utils.migrations.AddIndexConcurrentlyIfSupported(
+            model_name='user',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['email'], name='users_active_email_idx'),
+        ),
+        myapp.utils.migrations.AddIndexConcurrentlyIfSupported(
+            model_name='user',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='users_deleted_at_idx'),
+        ),
+    ]
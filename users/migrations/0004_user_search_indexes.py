@@ -0,0 +1,48 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Mirrors users.search.SEARCH_FIELDS, a migration must not import the current code
+SEARCH_FIELDS = ("username", "email", "first_name", "last_name")
+
+# lower() returns text, text_pattern_ops lets LIKE 'prefix%' use the btree whatever the collation.
+# Both are partial like the other lookup indexes, the default manager never reads soft-deleted rows.
+POSTGRESQL_INDEXES = (
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS "users_{field}_lower_idx" '
+    'ON "users" (lower("{field}") text_pattern_ops) WHERE "deleted_at" IS NULL',
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS "users_{field}_trgm_idx" '
+    'ON "users" USING gin (lower("{field}") gin_trgm_ops) WHERE "deleted_at" IS NULL',
+)
+# SQLite and others: expression indexes only, the fuzzy search falls back to a substring scan
+DEFAULT_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS "users_{field}_lower_idx" ON "users" (lower("{field}")) WHERE "deleted_at" IS NULL',
+)
+INDEX_NAMES = ("users_{field}_lower_idx", "users_{field}_trgm_idx")
+
+
+def create_search_indexes(apps, schema_editor):
+    postgresql = schema_editor.connection.vendor == "postgresql"
+    for field in SEARCH_FIELDS:
+        for statement in POSTGRESQL_INDEXES if postgresql else DEFAULT_INDEXES:
+            schema_editor.execute(statement.format(field=field))
+
+
+def drop_search_indexes(apps, schema_editor):
+    concurrently = "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+    for field in SEARCH_FIELDS:
+        for name in INDEX_NAMES:
+            schema_editor.execute(f'DROP INDEX {concurrently}IF EXISTS "{name.format(field=field)}"')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run in a transaction, and doesn't block writes on a large table
+    atomic = False
+
+    dependencies = [
+        ('users', '0003_soft_delete_indexes'),
+    ]
+
+    operations = [
+        # No-op outside PostgreSQL
+        TrigramExtension(),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -1,13 +1,142 @@
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager as DjangoUserManager
+from django.utils import timezone
 from myapp.configurations.base_model import BaseModel
+from myapp.utils import hashing
+
+ACTIVE = models.Q(deleted_at__isnull=True)
+
+# Reverse one-to-one added by the tenants app, linking a user to its tenant role group
+TENANT_ROLE_LINK = "tenant_role_group_user"
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    def delete(self):
+        # Same return shape as QuerySet.delete(), related rows are left alone
+        count = self.update(deleted_at=timezone.now())
+        return count, {self.model._meta.label: count}
+
+    delete.queryset_only = True
+
+    def hard_delete(self):
+        return super().delete()
+
+    hard_delete.queryset_only = True
+
+    def restore(self):
+        return self.update(deleted_at=None)
+
+    def deleted(self):
+        return self.filter(deleted_at__isnull=False)
+
+
+class AllUsersManager(DjangoUserManager.from_queryset(SoftDeleteQuerySet)):
+    """
+    Every row, soft-deleted ones included (purge job, admin tooling)
+    """
+
+    def _create_user_object(self, username, email, password, **extra_fields):
+        # Django hashes with make_password() here directly, route it through User.set_password
+        user = super()._create_user_object(username, email, None, **extra_fields)
+        user.set_password(password)
+        return user
+
+
+class UserManager(AllUsersManager):
+    """
+    Default manager, soft-deleted users don't exist for the API, authentication or sessions
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(ACTIVE)
+
 
 # Create your models here.
 class User(AbstractUser, BaseModel):
     class Meta:
         db_table = 'users'
+        # Lookups only ever target active rows, the indexes leave soft-deleted ones out
+        # (username already has its unique index, created_at the BaseModel one)
+        indexes = [
+            models.Index(fields=["email"], condition=ACTIVE, name="users_active_email_idx"),
+            # For the purge job, only soft-deleted rows
+            models.Index(
+                fields=["deleted_at"], condition=models.Q(deleted_at__isnull=False), name="users_deleted_at_idx"
+            ),
+        ]
+
+    objects = UserManager()
+    all_objects = AllUsersManager()
 
     deleted_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
-        return self.email or self.username
\ No newline at end of file
+        return self.email or self.username
+
+    @property
+    def role_group(self):
+        # None for users without a tenant role (RelatedObjectDoesNotExist is an AttributeError)
+        link = getattr(self, TENANT_ROLE_LINK, None)
+        return link.tenant_role_group if link is not None else None
+
+    def validate_unique(self, exclude=None):
+        # The default manager hides soft-deleted rows but the unique index doesn't: check usernames against
+        # every row so forms and the admin report a taken username instead of raising an IntegrityError
+        super().validate_unique(exclude)
+        if exclude and "username" in exclude:
+            return
+        taken = User.all_objects.filter(username=self.username)
+        if not self._state.adding:
+            taken = taken.exclude(pk=self.pk)
+        if taken.exists():
+            raise ValidationError({"username": [self.unique_error_message(User, ("username",))]})
+
+    def delete(self, using=None, keep_parents=False):
+        self.deleted_at = timezone.now()
+        self.save(update_fields=["deleted_at"], using=using)
+        return 1, {self._meta.label: 1}
+
+    def hard_delete(self, using=None, keep_parents=False):
+        return super().delete(using=using, keep_parents=keep_parents)
+
+    def restore(self):
+        self.deleted_at = None
+        self.save(update_fields=["deleted_at"])
+
+    # Password hashing goes through the bounded pool (settings.PASSWORD_HASHING_EXECUTOR),
+    # so authenticate(), aauthenticate() and create_user() never hash on the request thread
+    def set_password(self, raw_password):
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        def setter(raw_password):
+            self.set_password(raw_password)
+            # Password hash upgrades shouldn't be considered password changes.
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return hashing.check_password(raw_password, self.password, setter)
+
+    async def acheck_password(self, raw_password):
+        async def setter(raw_password):
+            self.password = await hashing.amake_password(raw_password)
+            await self.asave(update_fields=["password"])
+
+        return await hashing.acheck_password(raw_password, self.password, setter)
+
+
+def tenant_role_models():
+    """
+    (TenantRoleGroupUser, TenantRoleGroup, TenantRolePermission, Tenant) as linked to User by the tenants app,
+    None when no tenant role relation is installed
+    """
+    try:
+        link = User._meta.get_field(TENANT_ROLE_LINK).related_model
+    except FieldDoesNotExist:
+        return None
+    role_group = link._meta.get_field("tenant_role_group").related_model
+    role_permission = role_group._meta.get_field("tenant_role_permissions").related_model
+    tenant = role_group._meta.get_field("tenant").related_model
+    return link, role_group, role_permission, tenant
@@ -0,0 +1,92 @@
+from functools import reduce
+from operator import or_
+
+from django.db import connections
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Greatest, Length, Lower
+from django.db.models.lookups import Contains, StartsWith
+from rest_framework.exceptions import ValidationError
+
+from myapp.configurations.pagination import KeysetPaginator
+
+# Each has a lower() prefix index and, on PostgreSQL, a pg_trgm GIN index (migration 0004)
+SEARCH_FIELDS = ("username", "email", "first_name", "last_name")
+
+# pg_trgm needs 3 characters for a trigram that isn't padding, shorter queries match most of the table
+MIN_QUERY_LENGTH = 3
+MAX_QUERY_LENGTH = 100
+
+# Rows kept per tier, only these are ranked and paged: a vague query never sorts every match
+MAX_CANDIDATES = 500
+
+# Any prefix match ranks above every fuzzy-only match
+PREFIX_RANK = 1.0
+
+
+def normalize_query(raw):
+    query = (raw or "").strip().lower()
+    if len(query) < MIN_QUERY_LENGTH:
+        raise ValidationError({"q": f"At least {MIN_QUERY_LENGTH} characters"})
+    return query[:MAX_QUERY_LENGTH]
+
+
+def search_users(queryset, query):
+    """
+    Active users matching `query` (already normalized) by prefix or similarity, annotated with `rank`.
+
+    - prefix: lower(field) LIKE 'query%', served by the lower() text_pattern_ops indexes
+    - PostgreSQL: lower(field) % 'query' (pg_trgm similarity above pg_trgm.similarity_threshold) over the
+      GIN indexes, ranked by the best similarity
+    - other databases: substring match instead of similarity, ranked by the share of the field the query covers
+
+    Each tier keeps its MAX_CANDIDATES best ranked rows, so at most twice that many results are ranked and paged.
+    """
+    prefix = reduce(or_, (Q(StartsWith(Lower(field), query)) for field in SEARCH_FIELDS))
+    prefix_rank = Case(When(prefix, then=Value(PREFIX_RANK)), default=Value(0.0), output_field=FloatField())
+
+    if connections[queryset.db].vendor == "postgresql":
+        from django.contrib.postgres.lookups import TrigramSimilar
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        fuzzy = reduce(or_, (Q(TrigramSimilar(Lower(field), query)) for field in SEARCH_FIELDS))
+        similarity = Greatest(*(TrigramSimilarity(Lower(field), query) for field in SEARCH_FIELDS))
+    else:
+        fuzzy = reduce(or_, (Q(Contains(Lower(field), query)) for field in SEARCH_FIELDS))
+        covered = Value(float(len(query)), output_field=FloatField())
+        similarity = Greatest(*(
+            Case(
+                When(Contains(Lower(field), query), then=covered / Length(field)),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+            for field in SEARCH_FIELDS
+        ))
+
+    def best(tier):
+        # Ordered like the final rank within the tier, the LIMIT makes it a top-N heapsort
+        return (
+            queryset.filter(tier)
+            .annotate(similarity=similarity)
+            .order_by("-similarity", "pk")
+            .values("pk")[:MAX_CANDIDATES]
+        )
+
+    # Both tiers are found through the indexes, the outer query ranks and sorts no more than
+    # 2 * MAX_CANDIDATES rows
+    return queryset.filter(Q(pk__in=best(prefix)) | Q(pk__in=best(fuzzy))).annotate(rank=prefix_rank + similarity)
+
+
+class RankedKeysetPaginator(KeysetPaginator):
+    """
+    Keyset pages over (rank, id), best match first
+    """
+
+    ordering_field = "rank"
+    default_page_size = 20
+    max_page_size = 100
+
+    def encode_value(self, value):
+        return value
+
+    def decode_value(self, value):
+        return float(value)
@@ -0,0 +1,78 @@
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from myapp.permissions.codenames import invalidate_all_codenames, invalidate_user_codenames
+from users.cache import invalidate_all_profiles, invalidate_profile
+from users.models import User, tenant_role_models
+
+M2M_WRITES = {"post_add", "post_remove", "post_clear"}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # login() only touches last_login, which is not part of the profile
+    if update_fields and set(update_fields) == {"last_login"}:
+        return
+    invalidate_profile(instance.pk)
+    invalidate_user_codenames(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_relations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in M2M_WRITES:
+        return
+
+    if not reverse:
+        invalidate_profile(instance.pk)
+        invalidate_user_codenames(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            invalidate_profile(user_id)
+            invalidate_user_codenames(user_id)
+    else:
+        # group.user_set.clear() does not say which users were affected
+        invalidate_all_profiles()
+        invalidate_all_codenames()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def roles_changed(sender, **kwargs):
+    invalidate_all_profiles()
+    invalidate_all_codenames()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, action, **kwargs):
+    if action in M2M_WRITES:
+        invalidate_all_profiles()
+        invalidate_all_codenames()
+
+
+# The WhoAmI profile embeds the user's tenant role group with its tenant and permissions
+def tenant_role_user_changed(sender, instance, **kwargs):
+    invalidate_profile(instance.user_id)
+
+
+def tenant_roles_changed(sender, **kwargs):
+    # A role group, its permissions and its tenant are shared by every user holding the role
+    invalidate_all_profiles()
+
+
+def connect_tenant_role_receivers():
+    models = tenant_role_models()
+    if models is None:
+        return
+    link, *shared = models
+    for signal in (post_save, post_delete):
+        signal.connect(tenant_role_user_changed, sender=link)
+        for model in shared:
+            signal.connect(tenant_roles_changed, sender=model)
+
+
+connect_tenant_role_receivers()
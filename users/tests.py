@@ -1,10 +1,53 @@
 # users/tests/test_views.py
 
+import base64
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipIf
 from django.contrib.auth import get_user_model
-from django.urls import reverse
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.forms import modelform_factory
+from django.core.management.base import CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.conf import settings
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework.test import APITestCase
 from rest_framework import status
-from users.models import User
+from types import SimpleNamespace
+from django.contrib.auth.models import Group, Permission
+from myapp.enums.application_role_names import PermissionEnum
+from myapp.permissions.core_roles import HasPermission
+from myapp.configurations.conditional import ConditionalGetMixin, NotModified
+from myapp.configurations.renderers import JSON_BACKENDS, ApiWrapperRenderer
+from myapp.configurations.throttling import IPTokenBucketThrottle, TokenBucketThrottle, gcra
+from myapp.utils.responses import success, error
+from myapp.utils import hashing
+from myapp.utils.env_constants import env, load_env, to_bool, to_duration
+from myapp.configurations.logging import JSONFormatter, SamplingFilter, logger
+from myapp.configurations.query_budget import QueryBudgetExceeded, QueryTracker, query_budget, query_tracker
+from myapp.configurations.openapi import SchemaArtifact
+from myapp.configurations.yasg_wrapper import LazyResponses
+from myapp.utils.imports import lazy_view
+from users import urls as users_urls
+from users.management.commands import bench
+from users.management.commands.create_users import DEFAULT_PASSWORD
+from users.management.commands.importprofile import parse_importtime
+from users.cache import get_cached_profile
+from users.models import User, tenant_role_models
+from users import views
+from users.views import WhoAmIView
 
 
 class UserViewsTestCase(APITestCase):
@@ -78,4 +121,942 @@ class UserViewsTestCase(APITestCase):
         }
         response = self.client.post(self.register_url, data)
         print(response.content)
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class FetchAllUsersPaginationTestCase(APITestCase):
+    """
+    Keyset pagination of the user list.
+    """
+
+    def setUp(self):
+        self.users_url = reverse('fetch_all_users')
+        self.superuser = User.objects.create_superuser(
+            username='admin',
+            password='#Admin1234',
+            email='admin@gmail.com'
+        )
+        for i in range(5):
+            User.objects.create_user(username=f'user{i}', password='#Password123')
+        self.client.force_login(self.superuser)
+
+    def test_pages_cover_all_users_once(self):
+        """Following next cursors visits every user exactly once, newest first."""
+        seen = []
+        params = {'page_size': 2}
+        while True:
+            response = self.client.get(self.users_url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            page = response.json()['data']
+            seen.extend(user['id'] for user in page['results'])
+            if not page['next']:
+                break
+            params['cursor'] = page['next']
+
+        expected = list(User.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_previous_cursor_returns_previous_page(self):
+        """The previous cursor of page two yields page one again."""
+        first = self.client.get(self.users_url, {'page_size': 2}).json()['data']
+        second = self.client.get(self.users_url, {'page_size': 2, 'cursor': first['next']}).json()['data']
+        back = self.client.get(self.users_url, {'page_size': 2, 'cursor': second['previous']}).json()['data']
+        self.assertIsNone(first['previous'])
+        self.assertEqual(back['results'], first['results'])
+
+    def test_invalid_cursor(self):
+        """A tampered cursor is rejected as a bad request."""
+        response = self.client.get(self.users_url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cursor_with_non_integer_pk(self):
+        """A well-formed cursor carrying a non-integer pk is a bad request, not a server error."""
+        cursor = self.client.get(self.users_url, {'page_size': 1}).json()['data']['next']
+        position = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        for pk in ('abc', [1], None):
+            position['i'] = pk
+            tampered = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+            response = self.client.get(self.users_url, {'cursor': tampered})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ExportUsersTestCase(APITestCase):
+    """
+    Streaming export of the users table.
+    """
+
+    def setUp(self):
+        self.export_url = reverse('export_users')
+        self.superuser = User.objects.create_superuser(
+            username='admin',
+            password='#Admin1234',
+            email='admin@gmail.com'
+        )
+
+    def test_requires_super_admin(self):
+        """Anonymous users cannot export."""
+        response = self.client.get(self.export_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_ndjson_and_csv(self):
+        """Both formats stream one line per user without the response envelope."""
+        self.client.force_login(self.superuser)
+
+        response = self.client.get(self.export_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), User.objects.count())
+        self.assertIn('"username":"admin"', lines[0])
+
+        response = self.client.get(self.export_url, {'output': 'csv'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[1], 'username')
+        self.assertEqual(len(lines), User.objects.count() + 1)
+
+
+class WhoAmICacheTestCase(APITestCase):
+    """
+    Cached WhoAmI payloads and their signal-driven invalidation.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='cached_user', password='#CachedUser123')
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return {'user': {'id': self.user.id, 'first_name': self.user.first_name}}
+
+    def test_second_call_is_served_from_cache(self):
+        """The payload is only built once while nothing changes."""
+        get_cached_profile(self.user.id, self.build)
+        get_cached_profile(self.user.id, self.build)
+        self.assertEqual(self.builds, 1)
+
+    def test_user_and_group_changes_invalidate(self):
+        """Saving the user, joining a group or editing a group rebuilds the payload."""
+        get_cached_profile(self.user.id, self.build)
+
+        self.user.first_name = 'Changed'
+        self.user.save()
+        get_cached_profile(self.user.id, self.build)
+        self.assertEqual(self.builds, 2)
+
+        group = Group.objects.create(name='Cached Group')
+        get_cached_profile(self.user.id, self.build)
+        self.user.groups.add(group)
+        get_cached_profile(self.user.id, self.build)
+        self.assertEqual(self.builds, 4)
+
+    def test_login_does_not_invalidate(self):
+        """Updating last_login on login keeps the cached payload."""
+        get_cached_profile(self.user.id, self.build)
+        self.client.force_login(self.user)
+        get_cached_profile(self.user.id, self.build)
+        self.assertEqual(self.builds, 1)
+
+    def grant_tenant_role(self, permissions):
+        link, role_group, role_permission, tenant = tenant_role_models()
+        group = role_group.objects.create(name='Tenant Role', tenant=tenant.objects.create(name='Tenant'))
+        role_permission.objects.bulk_create(
+            role_permission(tenant_role_group=group, permission=permission) for permission in permissions
+        )
+        link.objects.create(user=self.user, tenant_role_group=group)
+        return group
+
+    def build_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            WhoAmIView().build_profile(self.user.id)
+        return len(queries)
+
+    def test_profile_without_tenant_role(self):
+        """A user without a tenant role gets role_group None."""
+        profile = WhoAmIView().build_profile(self.user.id)
+        self.assertEqual(profile['user']['id'], self.user.id)
+        self.assertIsNone(profile['role_group'])
+
+    @skipIf(tenant_role_models() is None, 'tenants app does not link users to role groups')
+    def test_cold_profile_queries_do_not_grow_with_permissions(self):
+        """The real build runs the same queries for a role with 1 or 10 permissions."""
+        permissions = list(Permission.objects.order_by('id')[:10])
+        group = self.grant_tenant_role(permissions[:1])
+        one = self.build_queries()
+
+        _, _, role_permission, _ = tenant_role_models()
+        role_permission.objects.bulk_create(
+            role_permission(tenant_role_group=group, permission=permission) for permission in permissions[1:]
+        )
+        self.assertEqual(self.build_queries(), one)
+        self.assertEqual(len(WhoAmIView().build_profile(self.user.id)['role_group']['permissions']), 10)
+
+    @skipIf(tenant_role_models() is None, 'tenants app does not link users to role groups')
+    def test_tenant_role_changes_invalidate(self):
+        """Editing the role group, its permissions or its tenant rebuilds the payload."""
+        group = self.grant_tenant_role([])
+        get_cached_profile(self.user.id, self.build)
+
+        _, _, role_permission, _ = tenant_role_models()
+        role_permission.objects.create(tenant_role_group=group, permission=Permission.objects.first())
+        get_cached_profile(self.user.id, self.build)
+        group.tenant.save()
+        get_cached_profile(self.user.id, self.build)
+        group.save()
+        get_cached_profile(self.user.id, self.build)
+        self.assertEqual(self.builds, 4)
+
+
+class HasPermissionTestCase(APITestCase):
+    """
+    Codename checks against the cached effective permission set.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='perm_user', password='#PermUser123')
+        self.group = Group.objects.create(name='Viewers')
+        self.group.permissions.add(Permission.objects.get(codename='view_user'))
+        self.request = SimpleNamespace(user=self.user)
+
+    def test_group_permission_grants_access(self):
+        """Codenames granted through a group pass, others do not."""
+        self.user.groups.add(self.group)
+        self.assertTrue(HasPermission('view_user').has_permission(self.request, None))
+        self.assertTrue(HasPermission('users.view_user').has_permission(self.request, None))
+        self.assertFalse(HasPermission('view_user', 'delete_user').has_permission(self.request, None))
+
+    def test_cached_checks_skip_the_database(self):
+        """After the first check the codenames come from the process cache."""
+        permission = HasPermission('view_user')
+        permission.has_permission(self.request, None)
+        with self.assertNumQueries(0):
+            permission.has_permission(self.request, None)
+
+    def test_group_changes_invalidate(self):
+        """Granting a permission to a group is visible on the next check."""
+        self.user.groups.add(self.group)
+        permission = HasPermission('delete_user')
+        self.assertFalse(permission.has_permission(self.request, None))
+        self.group.permissions.add(Permission.objects.get(codename='delete_user'))
+        self.assertTrue(permission.has_permission(self.request, None))
+
+    def test_setup_roles_invalidates(self):
+        """setup_roles writes the through table directly, cached checks still see the restored grants."""
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('setup_roles', stdout=StringIO())
+        group = Group.objects.get(name='User')
+        self.user.groups.add(group)
+        permission = HasPermission('view_user')
+        self.assertTrue(permission.has_permission(self.request, None))
+
+        group.permissions.clear()
+        self.assertFalse(permission.has_permission(self.request, None))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('setup_roles', stdout=StringIO())
+        self.assertTrue(permission.has_permission(self.request, None))
+
+
+class PermissionEnumTestCase(APITestCase):
+    """
+    Codename table built from the installed models.
+    """
+
+    def test_installed_model_codenames(self):
+        """Both the class name and the lowercase model name resolve."""
+        self.assertEqual(PermissionEnum.User.view, 'view_user')
+        self.assertIs(PermissionEnum.User, PermissionEnum.user)
+        self.assertEqual(PermissionEnum.Group.add, 'add_group')
+
+    def test_unknown_model_fails_fast(self):
+        """A typo raises instead of producing a codename that never matches."""
+        with self.assertRaises(AttributeError):
+            PermissionEnum.Usr
+
+
+class ResponseEnvelopeTestCase(APITestCase):
+    """
+    success()/error() envelopes rendered by ApiWrapperRenderer.
+    """
+
+    def render(self, response):
+        return ApiWrapperRenderer().render(response.data, renderer_context={'response': response})
+
+    def test_success_payload_is_not_copied_or_mutated(self):
+        """The payload becomes the envelope's data untouched."""
+        payload = {'id': 1}
+        response = success('Fetched', payload)
+        self.assertIs(response.data, payload)
+        self.assertEqual(payload, {'id': 1})
+        self.assertEqual(
+            self.render(response),
+            b'{"status":"Success","status_code":200,"message":"Fetched","data":{"id":1}}'
+        )
+
+    def test_falsy_payloads_are_kept(self):
+        """0, "", False and [] stay the data instead of becoming {}."""
+        for payload, data in ((0, b'0'), ('', b'""'), (False, b'false'), ([], b'[]')):
+            with self.subTest(payload=payload):
+                self.assertTrue(self.render(success('Fetched', payload)).endswith(b'"data":' + data + b'}'))
+
+    def test_list_and_error_envelopes(self):
+        """Lists nest under data and errors carry their details."""
+        self.assertEqual(
+            self.render(success('Listed', [1, 2])),
+            b'{"status":"Success","status_code":200,"message":"Listed","data":[1,2]}'
+        )
+        self.assertEqual(
+            self.render(error('Nope', {'field': ['bad']}, 400)),
+            b'{"status":"Error","status_code":400,"message":"Nope","data":{"field":["bad"]}}'
+        )
+
+    @skipIf(JSON_BACKENDS['orjson'] is None, 'orjson is not installed')
+    def test_orjson_floats_match_stdlib(self):
+        """Small floats orjson writes differently are re-encoded by the stdlib path."""
+        response = success('Floats', [1e-07, 1e-05, 9.99e-05, 0.0001, 0.1, 1e+16, 1.23e-10])
+        expected = self.render(response)
+        orjson_settings = {**settings.REST_FRAMEWORK, 'JSON_ENCODER_BACKEND': 'orjson'}
+        with override_settings(REST_FRAMEWORK=orjson_settings):
+            self.assertEqual(self.render(response), expected)
+
+    def test_unavailable_backend_is_a_configuration_error(self):
+        """Selecting orjson without it installed fails loudly instead of falling back to stdlib."""
+        orjson_settings = {**settings.REST_FRAMEWORK, 'JSON_ENCODER_BACKEND': 'orjson'}
+        with override_settings(REST_FRAMEWORK=orjson_settings), \
+                mock.patch.dict(JSON_BACKENDS, {'orjson': None}):
+            with self.assertRaises(ImproperlyConfigured):
+                self.render(success('Fetched', {}))
+
+
+class ConditionalGetTestCase(APITestCase):
+    """
+    ETag revalidation of the user list.
+    """
+
+    def setUp(self):
+        self.users_url = reverse('fetch_all_users')
+        self.superuser = User.objects.create_superuser(
+            username='admin',
+            password='#Admin1234',
+            email='admin@gmail.com'
+        )
+        self.client.force_login(self.superuser)
+
+    def test_unchanged_page_is_not_modified(self):
+        """Sending back the ETag yields an empty 304 until a row on the page changes."""
+        response = self.client.get(self.users_url)
+        etag = response.headers['ETag']
+
+        response = self.client.get(self.users_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+
+        self.superuser.first_name = 'Changed'
+        self.superuser.save()
+        response = self.client.get(self.users_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_not_modified_carries_validators(self):
+        """An early 304 from the handler sends the ETag and Last-Modified the 200 would have had."""
+        etag = self.client.get(reverse('who_am_i')).headers['ETag']
+        response = self.client.get(reverse('who_am_i'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.headers['ETag'], etag)
+
+        modified = timezone.now().replace(microsecond=0) - timedelta(days=1)
+        request = SimpleNamespace(
+            method='GET', _request=RequestFactory().get('/', HTTP_IF_MODIFIED_SINCE=http_date(timezone.now().timestamp()))
+        )
+        with self.assertRaises(NotModified) as raised:
+            ConditionalGetMixin().check_not_modified(request, etag='"page"', last_modified=modified)
+        self.assertEqual(raised.exception.response.headers['ETag'], '"page"')
+        self.assertEqual(raised.exception.response.headers['Last-Modified'], http_date(modified.timestamp()))
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {'login_username': '2/min', 'login_ip': '100/min'},
+})
+class LoginThrottleTestCase(APITestCase):
+    """
+    Token bucket throttling of the login endpoint.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.login_url = reverse('login_user')
+        User.objects.create_user(username='target', password='#Target1234')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_username_bucket_rejects_with_retry_after(self):
+        """Once the username bucket is empty the request is rejected before authentication."""
+        for _ in range(2):
+            response = self.client.post(self.login_url, {'username': 'target', 'password': 'wrong'})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.post(self.login_url, {'username': 'TARGET', 'password': 'wrong'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response.headers)
+        self.assertEqual(response.json()['status'], 'Error')
+
+        response = self.client.post(self.login_url, {'username': 'someone_else', 'password': 'wrong'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'login_ip': '1/min', 'login_global': '2/min'},
+    })
+    def test_rejected_requests_do_not_spend_global_tokens(self):
+        """One IP over its limit can't drain the deployment-wide bucket for everyone else."""
+        for expected in (status.HTTP_404_NOT_FOUND, status.HTTP_429_TOO_MANY_REQUESTS, status.HTTP_429_TOO_MANY_REQUESTS):
+            response = self.client.post(self.login_url, {'username': 'target', 'password': 'wrong'})
+            self.assertEqual(response.status_code, expected)
+
+        response = self.client.post(
+            self.login_url, {'username': 'target', 'password': 'wrong'}, REMOTE_ADDR='10.0.0.2'
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bucket_refills_continuously(self):
+        """No double burst across a period boundary, tokens come back at capacity / period."""
+        throttle = IPTokenBucketThrottle()
+        request = SimpleNamespace(META={'REMOTE_ADDR': '10.0.0.9'})
+        view = SimpleNamespace(throttle_scope='login', throttle_rates={'login_ip': '2/min'})
+
+        def allowed_at(seconds):
+            with mock.patch('time.time_ns', return_value=(1_000_000 + seconds) * 10**9):
+                return throttle.allow_request(request, view)
+
+        self.assertTrue(allowed_at(59))
+        self.assertTrue(allowed_at(59))
+        # A fixed window would hand out two fresh tokens at t=60
+        self.assertFalse(allowed_at(61))
+        self.assertAlmostEqual(throttle.wait(), 28)
+        # The rejection gave its token back, one has refilled 30 seconds after the burst
+        self.assertTrue(allowed_at(89))
+        self.assertFalse(allowed_at(89))
+
+    def test_gcra_decision(self):
+        """Passes while the arrival time stays within one period, the key lives until the bucket is full."""
+        self.assertEqual(gcra(tat=61_000, now=1_000, period=60), (True, 0, 60))
+        self.assertEqual(gcra(tat=91_000, now=1_000, period=60), (False, 30, None))
+
+
+class AsyncUrls:
+    # The routes users/urls.py picks when ASYNC_VIEWS is on, under the same names
+    urlpatterns = [
+        path('login', views.AsyncLoginUserView.as_view(), name='login_user'),
+        path('whoami', views.AsyncWhoAmIView.as_view(), name='who_am_i'),
+        path('', views.AsyncFetchAllUsers.as_view(), name='fetch_all_users'),
+    ]
+
+
+@override_settings(ASYNC_VIEWS=True, ROOT_URLCONF=AsyncUrls, REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {'login_username': '2/min', 'login_ip': '100/min'},
+})
+class AsyncViewsTestCase(APITestCase):
+    """
+    The native async login, whoami and user list views.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='async_user', password='#AsyncUser123')
+
+    def tearDown(self):
+        cache.clear()
+
+    def login(self, password='#AsyncUser123'):
+        return self.async_client.post(
+            reverse('login_user'), {'username': 'async_user', 'password': password}, content_type='application/json'
+        )
+
+    async def test_login_then_whoami(self):
+        """The session set by the async login serves the cached profile and its ETag."""
+        response = await self.login()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = await self.async_client.get(reverse('who_am_i'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data']['user']['username'], 'async_user')
+
+        response = await self.async_client.get(reverse('who_am_i'), headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_cache_and_throttles_stay_async(self):
+        """Neither the profile cache nor the token buckets make a sync cache call on the event loop."""
+        with mock.patch('myapp.utils.cache.namespace_version', side_effect=AssertionError('sync cache call')), \
+                mock.patch.object(TokenBucketThrottle, 'allow_request', side_effect=AssertionError('sync throttle')):
+            self.assertEqual((await self.login()).status_code, status.HTTP_200_OK)
+            response = await self.async_client.get(reverse('who_am_i'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    async def test_login_is_throttled(self):
+        """The username bucket rejects the third attempt with Retry-After."""
+        for _ in range(2):
+            self.assertEqual((await self.login('wrong')).status_code, status.HTTP_404_NOT_FOUND)
+
+        response = await self.login('wrong')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response.headers)
+
+    async def test_user_list(self):
+        """A super admin pages through the users."""
+        admin = await User.objects.acreate_superuser(username='async_admin', password='#AsyncAdmin123')
+        await self.async_client.aforce_login(admin)
+
+        response = await self.async_client.get(reverse('fetch_all_users'), {'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        page = response.json()['data']
+        self.assertEqual(len(page['results']), 1)
+
+        response = await self.async_client.get(reverse('fetch_all_users'), {'page_size': 1, 'cursor': page['next']})
+        self.assertEqual(response.json()['data']['results'][0]['username'], 'async_user')
+
+
+@override_settings(PASSWORD_HASHING_EXECUTOR={'KIND': 'thread', 'MAX_WORKERS': 1, 'MAX_QUEUE': 0, 'QUEUE_TIMEOUT': 0.01})
+class PasswordHashingPoolTestCase(APITestCase):
+    """
+    Password hashing offloaded to the bounded worker pool.
+    """
+
+    def setUp(self):
+        hashing._executor = None
+
+    def tearDown(self):
+        if hashing._executor is not None:
+            hashing._executor.shutdown()
+        hashing._executor = None
+
+    def test_login_hashes_in_pool(self):
+        """create_user and authenticate go through the pool and keep working end to end."""
+        User.objects.create_user(username='pooled', password='#Pooled1234')
+        self.assertIsNotNone(hashing._executor)
+
+        response = self.client.post(reverse('login_user'), {'username': 'pooled', 'password': '#Pooled1234'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_full_pool_sheds_load(self):
+        """With every slot taken the next hash is refused instead of queueing forever."""
+        executor = hashing.get_executor()
+        executor._slots.acquire()
+        try:
+            with self.assertRaises(hashing.HashingPoolBusy):
+                hashing.make_password('#Busy1234')
+        finally:
+            executor._slots.release()
+
+    def test_full_pool_sheds_login_with_retry_after(self):
+        """A login refused by the pool is a 503 with Retry-After."""
+        User.objects.create_user(username='pooled', password='#Pooled1234')
+        executor = hashing.get_executor()
+        executor._slots.acquire()
+        try:
+            response = self.client.post(reverse('login_user'), {'username': 'pooled', 'password': '#Pooled1234'})
+        finally:
+            executor._slots.release()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+    def test_slow_hash_times_out_as_busy(self):
+        """A hash running past TIMEOUT is shed like a full pool, not a server error."""
+        User.objects.create_user(username='pooled', password='#Pooled1234')
+        slow = mock.patch(
+            'django.contrib.auth.hashers.verify_password', side_effect=lambda *args: time.sleep(0.2) or (False, False)
+        )
+        hashing.get_executor().timeout = 0.01
+        with slow:
+            response = self.client.post(reverse('login_user'), {'username': 'pooled', 'password': '#Pooled1234'})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn('Retry-After', response.headers)
+
+
+class DatabasePoolStatsTestCase(APITestCase):
+    """
+    Connection and pool statistics endpoint.
+    """
+
+    def test_superuser_only(self):
+        url = reverse('db_pool_stats')
+        User.objects.create_user(username='plain', password='#Plain1234')
+        self.client.login(username='plain', password='#Plain1234')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        User.objects.create_superuser(username='root', password='#Root1234')
+        self.client.login(username='root', password='#Root1234')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        default = response.json()['data']['databases']['default']
+        self.assertIn('conn_max_age', default)
+        self.assertIn('pooled', default)
+
+
+class EnvConstantsTestCase(APITestCase):
+    """
+    Typed .env loader.
+    """
+
+    def test_casts(self):
+        self.assertEqual(to_duration('300'), 300)
+        self.assertEqual(to_duration('5m'), 300)
+        self.assertEqual(to_duration('250ms'), 0.25)
+        self.assertTrue(to_bool('Yes'))
+        self.assertFalse(to_bool('off'))
+        with self.assertRaises(ValueError):
+            to_bool('maybe')
+
+    def test_environment_overrides_file(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.env', delete=False) as handle:
+            handle.write('ENV_TEST_FILE_ONLY="file"\nENV_TEST_BOTH="file"\n')
+        try:
+            with mock.patch.dict(os.environ, {'ENV_TEST_BOTH': 'process'}):
+                values = load_env(handle.name)
+            self.assertEqual(values['ENV_TEST_FILE_ONLY'], 'file')
+            self.assertEqual(values['ENV_TEST_BOTH'], 'process')
+        finally:
+            os.unlink(handle.name)
+
+
+class RequestLoggingTestCase(APITestCase):
+    """
+    Request context on log records, JSON formatting and sampling.
+    """
+
+    def test_records_carry_request_context(self):
+        with self.assertLogs('myapp', level='INFO') as logs:
+            response = self.client.get(reverse('get_csrf_token'), HTTP_X_REQUEST_ID='req-123')
+
+        self.assertEqual(response['X-Request-ID'], 'req-123')
+        record = next(r for r in logs.records if r.getMessage() == 'Setting CSRF Token')
+        self.assertEqual(record.request_id, 'req-123')
+        self.assertEqual(record.view, 'GetCsrfToken')
+        self.assertIsNotNone(record.duration_ms)
+
+        entry = json.loads(JSONFormatter().format(record))
+        self.assertEqual(entry['request_id'], 'req-123')
+        self.assertEqual(entry['path'], 'users/views.py:' + str(record.lineno))
+
+    def test_sampling_keeps_warnings(self):
+        sampling = SamplingFilter('users.views=0')
+        info = logging.LogRecord('myapp', logging.INFO, os.path.abspath('users/views.py'), 1, 'Logged in', None, None)
+        warning = logging.LogRecord('myapp', logging.WARNING, info.pathname, 1, 'Throttled', None, None)
+        other = logging.LogRecord('myapp', logging.INFO, os.path.abspath('myapp/urls.py'), 1, 'kept', None, None)
+
+        self.assertFalse(sampling.filter(info))
+        self.assertTrue(sampling.filter(warning))
+        self.assertTrue(sampling.filter(other))
+
+
+class MetricsTestCase(APITestCase):
+    """
+    Prometheus metrics middleware and endpoint.
+    """
+
+    def test_view_metrics_exposed(self):
+        User.objects.create_user(username='measured', password='#Measured1234')
+        self.client.post(reverse('login_user'), {'username': 'measured', 'password': '#Measured1234'})
+
+        with mock.patch.object(env.Metrics, 'token', 'scrape-token'):
+            response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.content.decode()
+        self.assertIn('http_request_duration_seconds_bucket{le="0.005",method="POST",view="login_user"}', body)
+        self.assertIn('http_requests_total{method="POST",status="200",view="login_user"}', body)
+        self.assertRegex(body, r'db_queries_per_request_sum\{view="login_user"\} [1-9]')
+
+    def test_token_is_required(self):
+        """A wrong or non-ASCII token is a 401, not a server error."""
+        with mock.patch.object(env.Metrics, 'token', 'scrape-token'):
+            for header in ('', 'Bearer wrong', 'Bearer tökén'):
+                response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION=header)
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_public_exposure_is_opt_in(self):
+        """Without a token the endpoint stays closed unless METRICS_PUBLIC is set."""
+        with mock.patch.object(env.Metrics, 'token', None):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+            with mock.patch.object(env.Metrics, 'public', True):
+                self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_200_OK)
+
+
+@query_budget(1)
+def over_budget(request):
+    list(User.objects.filter(username='a'))
+    list(User.objects.filter(username='b'))
+    return HttpResponse('done')
+
+
+class QueryBudgetUrls:
+    urlpatterns = [path('over-budget', over_budget, name='over_budget')]
+
+
+@override_settings(ROOT_URLCONF=QueryBudgetUrls)
+class QueryBudgetTestCase(APITestCase):
+    """
+    Per-view query budgets, enforced for every view request under myapp.test_settings.
+    """
+
+    def test_report_groups_repeated_shapes(self):
+        tracker = QueryTracker()
+        tracker.budget = 2
+        token = query_tracker.set(tracker)
+        try:
+            for user in User.objects.bulk_create([User(username=f'n{i}') for i in range(3)]):
+                list(Permission.objects.filter(user=user))
+            list(Permission.objects.filter(pk__in=[1, 2, 3]))
+        finally:
+            query_tracker.reset(token)
+
+        self.assertTrue(tracker.exceeded)
+        report = tracker.report('example')
+        self.assertIn('example ran', report)
+        self.assertIn('3x SELECT', report)
+        self.assertIn('users/tests.py:', report)
+
+    @override_settings(QUERY_BUDGET_MODE='raise')
+    def test_raise_mode_fails_the_request(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'over_budget ran 2 queries, budget is 1'):
+            Client().get('/over-budget')
+
+    @override_settings(QUERY_BUDGET_MODE='log')
+    def test_log_mode_reports_and_keeps_the_response(self):
+        with self.assertLogs(logger, 'WARNING') as logs:
+            response = Client().get('/over-budget')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'done')
+        self.assertIn('over_budget ran 2 queries, budget is 1', logs.output[0])
+        self.assertIn('2x SELECT', logs.output[0])
+
+
+class OpenAPISchemaTestCase(APITestCase):
+    """
+    Prebuilt / process-cached OpenAPI document.
+    """
+
+    def setUp(self):
+        SchemaArtifact.reset()
+
+    def tearDown(self):
+        SchemaArtifact.reset()
+
+    def test_schema_served_with_content_hash_etag(self):
+        url = reverse('schema-json', kwargs={'format': '.json'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('max-age=86400', response['Cache-Control'])
+        self.assertIn('/users/whoami', response.json()['paths'])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_prebuilt_artifact_is_served(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'schema.json'), 'w') as handle:
+                handle.write('{"swagger": "2.0", "prebuilt": true}')
+            with override_settings(OPENAPI_SCHEMA_DIR=directory):
+                response = self.client.get(reverse('schema-json', kwargs={'format': '.json'}))
+        self.assertTrue(response.json()['prebuilt'])
+
+    def test_response_wrappers_are_shared_between_endpoints(self):
+        from users.views import LoginUserView, LogoutUserView
+
+        login = LoginUserView.post._swagger_auto_schema['lazy_responses']
+        logout = LogoutUserView.get._swagger_auto_schema['lazy_responses']
+        self.assertIsInstance(login, LazyResponses)
+
+        login_responses, logout_responses = login.build(), logout.build()
+        self.assertIs(login_responses[403].schema, logout_responses[403].schema)
+        self.assertEqual(
+            login_responses[200].examples['application/json']['message'], 'User Logged In Successfully'
+        )
+
+
+class ImportProfileTestCase(APITestCase):
+    """
+    Deferred docs imports and the importtime report parsing.
+    """
+
+    def test_lazy_view_imports_on_first_call(self):
+        view = lazy_view('myapp.utils.responses.success')
+        self.assertEqual(view.__name__, 'success')
+        with mock.patch('myapp.utils.imports.import_string', return_value=lambda request: 'called') as loader:
+            view = lazy_view('myapp.utils.responses.success')
+            loader.assert_not_called()
+            self.assertEqual(view(None), 'called')
+            view(None)
+        loader.assert_called_once_with('myapp.utils.responses.success')
+
+    def test_parse_importtime(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       531 |     113040 | drf_yasg.views\n"
+            "import time:       511 |      95728 |   drf_yasg.renderers\n"
+        )
+        self.assertEqual(
+            parse_importtime(stderr),
+            [('drf_yasg.views', 531, 113040), ('drf_yasg.renderers', 511, 95728)],
+        )
+
+
+class BenchTestCase(APITestCase):
+    """
+    Scenarios and baseline comparison of the bench command.
+    """
+
+    baseline = {'who_am_i': {'rps': 1000.0, 'p95_ms': 10.0, 'queries': 2}}
+
+    def compare(self, result, threshold=20.0):
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.json')
+            with open(path, 'w') as handle:
+                json.dump({'endpoints': self.baseline}, handle)
+            bench.Command(stdout=out).compare({'who_am_i': result, 'new_endpoint': result}, path, threshold)
+        return out.getvalue()
+
+    def test_within_threshold_passes(self):
+        """Slower and lower throughput but inside the threshold, endpoints without a baseline are skipped."""
+        out = self.compare({'rps': 810.0, 'p95_ms': 11.9, 'queries': 2})
+        self.assertIn('No regressions', out)
+
+    def test_regressions_fail(self):
+        """p95 and throughput past the threshold, and any extra query, each count as a regression."""
+        with self.assertRaisesMessage(CommandError, '3 performance regression(s)'):
+            self.compare({'rps': 790.0, 'p95_ms': 12.1, 'queries': 3})
+        with self.assertRaisesMessage(CommandError, '1 performance regression(s)'):
+            self.compare({'rps': 1000.0, 'p95_ms': 10.0, 'queries': 3}, threshold=100.0)
+
+    def test_every_route_has_a_passing_scenario(self):
+        """Each users route is benchmarked, and one request of each scenario succeeds."""
+        self.assertEqual(
+            sorted(pattern.name for pattern in users_urls.urlpatterns), sorted(bench.SCENARIOS)
+        )
+        User.objects.create_superuser(username=bench.SUPERUSER, password=DEFAULT_PASSWORD)
+        User.objects.create_user(username=bench.REGULAR_USER, password=DEFAULT_PASSWORD)
+        command = bench.Command(stdout=StringIO())
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}):
+            for n, scenario in enumerate(bench.SCENARIOS.values()):
+                with self.subTest(scenario.name):
+                    command.timed_request(command.client_for(scenario), scenario, reverse(scenario.name), n)
+
+
+class SoftDeleteTestCase(APITestCase):
+    """
+    Soft-deleted users are hidden from the default manager and purged in batches.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gone', password='pass1234')
+        self.other = User.objects.create_user(username='kept', password='pass1234')
+
+    def test_delete_hides_user(self):
+        self.user.delete()
+
+        self.assertFalse(User.objects.filter(username='gone').exists())
+        self.assertTrue(User.all_objects.filter(username='gone').exists())
+        self.assertFalse(self.client.login(username='gone', password='pass1234'))
+
+        User.all_objects.filter(username='gone').restore()
+        self.assertTrue(User.objects.filter(username='gone').exists())
+
+    def test_register_rejects_soft_deleted_username(self):
+        self.user.delete()
+        response = self.client.post(reverse('register_user'), {
+            'username': 'gone', 'email': 'gone@example.com', 'password': '#Gone1234',
+            'first_name': 'Gone', 'last_name': 'User',
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_model_validation_sees_soft_deleted_usernames(self):
+        """ModelForms (the admin's included) reject the username instead of hitting the unique index."""
+        self.user.delete()
+        form = modelform_factory(User, fields=['username', 'password'])(data={'username': 'gone', 'password': 'x'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('username', form.errors)
+        User(username='fresh').validate_unique()
+        self.user.validate_unique()
+
+    def test_seeding_numbers_past_soft_deleted_rows(self):
+        """create_users numbers past the highest id even when the newest users are soft-deleted."""
+        call_command('create_users', count=2, seed=7, stdout=StringIO())
+        User.objects.exclude(pk__in=[self.user.pk, self.other.pk]).delete()
+        call_command('create_users', count=2, seed=7, stdout=StringIO())
+        self.assertEqual(User.all_objects.count(), 6)
+
+    def test_queryset_delete_is_soft(self):
+        count, _ = User.objects.filter(username__in=['gone', 'kept']).delete()
+        self.assertEqual(count, 2)
+        self.assertEqual(User.all_objects.deleted().count(), 2)
+
+    def test_purge_only_removes_expired_rows(self):
+        User.all_objects.filter(pk=self.user.pk).update(deleted_at=timezone.now() - timedelta(days=40))
+        self.other.delete()
+
+        out = StringIO()
+        call_command('purge_deleted_users', older_than='30d', batch_size=1, sleep='0', stdout=out)
+
+        self.assertIn('Purged 1 users', out.getvalue())
+        self.assertFalse(User.all_objects.filter(pk=self.user.pk).exists())
+        self.assertTrue(User.all_objects.filter(pk=self.other.pk).exists())
+
+
+class SearchUsersTestCase(APITestCase):
+    """
+    Ranked, keyset-paginated user search (substring fallback outside PostgreSQL).
+    """
+
+    def setUp(self):
+        self.search_url = reverse('search_users')
+        self.superuser = User.objects.create_superuser(username='admin', password='#Admin1234')
+        self.john = User.objects.create_user(username='john', email='j@example.com', password='#Password123')
+        self.jo = User.objects.create_user(
+            username='x1', first_name='Johanna', email='x1@example.com', password='#Password123'
+        )
+        self.bojo = User.objects.create_user(username='bojohn', email='b@example.com', password='#Password123')
+        self.gone = User.objects.create_user(username='johnny', password='#Password123')
+        self.gone.delete()
+        self.client.force_login(self.superuser)
+
+    def test_prefix_matches_rank_first(self):
+        response = self.client.get(self.search_url, {'q': 'JOH'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()['data']['results']
+
+        ids = [user['id'] for user in results]
+        self.assertEqual(set(ids[:2]), {self.john.id, self.jo.id})
+        self.assertIn(self.bojo.id, ids[2:])
+        self.assertNotIn(self.gone.id, ids)
+        self.assertGreater(results[0]['rank'], results[-1]['rank'])
+
+    def test_pages_cover_all_matches_once(self):
+        seen = []
+        params = {'q': 'joh', 'page_size': 1}
+        while True:
+            page = self.client.get(self.search_url, params).json()['data']
+            seen.extend(user['id'] for user in page['results'])
+            if not page['next']:
+                break
+            params['cursor'] = page['next']
+        self.assertEqual(sorted(seen), sorted([self.john.id, self.jo.id, self.bojo.id]))
+
+    def test_each_tier_is_bounded(self):
+        """Only MAX_CANDIDATES rows per tier are ranked, whatever the number of matches."""
+        with mock.patch('users.search.MAX_CANDIDATES', 1):
+            results = self.client.get(self.search_url, {'q': 'joh'}).json()['data']['results']
+        self.assertEqual([user['id'] for user in results], [self.john.id])
+
+    def test_tiers_keep_the_best_matches_not_the_oldest(self):
+        """With more prefix matches than MAX_CANDIDATES, a late exact match still makes the cut."""
+        for n in range(3):
+            User.objects.create_user(username=f'johnathan{n}', password='#Password123')
+        exact = User.objects.create_user(username='joh', password='#Password123')
+        with mock.patch('users.search.MAX_CANDIDATES', 2):
+            results = self.client.get(self.search_url, {'q': 'joh'}).json()['data']['results']
+        self.assertEqual(results[0]['id'], exact.id)
+        self.assertEqual([user['id'] for user in results], [exact.id, self.john.id])
+
+    def test_short_query_rejected(self):
+        response = self.client.get(self.search_url, {'q': 'jo'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,10 +1,20 @@
+from django.conf import settings
 from django.urls import path
 from users import views
 
+if settings.ASYNC_VIEWS:
+    # Coroutine views for ASGI servers, under WSGI they would add an event loop per request
+    LoginView, WhoAmIView, UsersView = views.AsyncLoginUserView, views.AsyncWhoAmIView, views.AsyncFetchAllUsers
+else:
+    LoginView, WhoAmIView, UsersView = views.LoginUserView, views.WhoAmIView, views.FetchAllUsers
+
 urlpatterns = [
     path('csrf', views.GetCsrfToken.as_view(), name='get_csrf_token'),
     path('register', views.RegisterUserView.as_view(), name='register_user'),
-    path('login', views.LoginUserView.as_view(), name='login_user'),
+    path('login', LoginView.as_view(), name='login_user'),
     path('logout', views.LogoutUserView.as_view(), name='logout_user'),
-    path('whoami', views.WhoAmIView.as_view(), name='who_am_i'),
+    path('whoami', WhoAmIView.as_view(), name='who_am_i'),
+    path('', UsersView.as_view(), name='fetch_all_users'),
+    path('search', views.SearchUsers.as_view(), name='search_users'),
+    path('export', views.ExportUsers.as_view(), name='export_users'),
 ]
\ No newline at end of file
@@ -1,17 +1,26 @@
 from django.contrib.auth.models import Permission
 from rest_framework import status
 from rest_framework.views import APIView
-from myapp.configurations.yasg_wrapper import make_response_serializer, swagger_response
+from myapp.configurations.yasg_wrapper import swagger_response, inherit_swagger_schema
+from myapp.configurations.async_views import AsyncAPIView
 from myapp.utils.responses import success, error
+from myapp.utils.streaming import STREAM_FORMATS, stream_queryset
 from myapp.permissions.core_roles import IsSuperAdmin
-from users.models import User
-from drf_yasg.utils import swagger_auto_schema
+from users.cache import aget_cached_profile, get_cached_profile
+from users.models import TENANT_ROLE_LINK, User, tenant_role_models
+from users.search import RankedKeysetPaginator, normalize_query, search_users
 from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.utils.decorators import method_decorator
-from django.contrib.auth import login, logout as a_logout, authenticate
+from django.contrib.auth import login, logout as a_logout, authenticate, aauthenticate, alogin
 from myapp.configurations.logging import logger
+from myapp.configurations.conditional import ConditionalGetMixin, objects_etag
+from myapp.configurations.pagination import KeysetPaginator
+from myapp.configurations.throttling import AUTH_THROTTLES
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from tenants.models import Tenant, TenantRoleGroup
 
 
 class GetCsrfToken(APIView):
@@ -19,6 +28,8 @@ class GetCsrfToken(APIView):
     Set the CSRF Token as a cookie on response
     """
 
+    query_budget = 0
+
     @swagger_response(
         input_serializer=None,
         output_serializer=None,
@@ -36,6 +47,10 @@ class GetCsrfToken(APIView):
 
 
 class RegisterUserView(APIView):
+    query_budget = 2
+    throttle_scope = "register"
+    throttle_classes = AUTH_THROTTLES
+
     class InputSerializer(serializers.ModelSerializer):
         first_name = serializers.CharField(required=True)
         last_name = serializers.CharField(required=True)
@@ -44,6 +59,18 @@ class RegisterUserView(APIView):
             ref_name = "RegisterUserInput"
             model = User
             fields = ["username", "email", "password", "first_name", "last_name"]
+            extra_kwargs = {
+                # The unique index covers soft-deleted rows too, the default manager hides them
+                "username": {
+                    "validators": [
+                        UnicodeUsernameValidator(),
+                        UniqueValidator(
+                            User.all_objects.all(),
+                            message=User._meta.get_field("username").error_messages["unique"],
+                        ),
+                    ],
+                },
+            }
 
         def create(self, validated_data):
             logger.info(validated_data)
@@ -80,6 +107,11 @@ class RegisterUserView(APIView):
 
 
 class LoginUserView(APIView):
+    # Session rotation and the last_login update included
+    query_budget = 10
+    throttle_scope = "login"
+    throttle_classes = AUTH_THROTTLES
+
     class InputSerializer(serializers.Serializer):
         username = serializers.CharField(required=True)
         password = serializers.CharField(required=True)
@@ -119,7 +151,9 @@ class LoginUserView(APIView):
         if not user:
             return error("User not found", {}, status.HTTP_404_NOT_FOUND)
 
-        logged_user = authenticate(request, user=user)
+        logged_user = authenticate(
+            request, username=username, password=serializer.validated_data["password"]
+        )
         if not logged_user:
             return error("Invalid Credentials", {}, status.HTTP_404_NOT_FOUND)
 
@@ -130,6 +164,8 @@ class LoginUserView(APIView):
 
 
 class LogoutUserView(APIView):
+    query_budget = 4
+
     @swagger_response(
         input_serializer=None,
         output_serializer=None,
@@ -146,7 +182,10 @@ class LogoutUserView(APIView):
         return success("User logged out successfully", {}, HTTP_200_OK)
 
 
-class WhoAmIView(APIView):
+class WhoAmIView(ConditionalGetMixin, APIView):
+    # Cold cache: session, user, the profile and its prefetches, whatever the number of permissions
+    query_budget = 8
+
     class OutputPermissionSerializer(serializers.ModelSerializer):
         class Meta:
             model = Permission
@@ -213,23 +252,37 @@ class WhoAmIView(APIView):
         if not request.user.is_authenticated:
             return error("User not authenticated", status=HTTP_400_BAD_REQUEST)
 
-        user = (
-            User.objects.filter(id=request.user.id)
-            .prefetch_related("tenant_role_group_user__tenant_role_group")
-            .first()
+        etag, data = get_cached_profile(request.user.id, lambda: self.build_profile(request.user.id))
+        self.check_not_modified(request, etag=etag)
+        return success("Profile Fetched Successfully", data)
+
+    def build_profile(self, user_id):
+        # Prefetch every hop so a cold cache costs the same queries however many permissions a role has
+        user = User.objects.filter(id=user_id).prefetch_related(*self.profile_prefetch()).first()
+        return self.serialize_profile(user)
+
+    @staticmethod
+    def profile_prefetch():
+        # Without the tenants relation every user has role_group None, there is nothing to prefetch
+        if tenant_role_models() is None:
+            return ()
+        return (
+            f"{TENANT_ROLE_LINK}__tenant_role_group__tenant",
+            f"{TENANT_ROLE_LINK}__tenant_role_group__tenant_role_permissions__permission",
         )
 
+    def serialize_profile(self, user):
         role_group = user.role_group
 
-        data = {
+        return {
             "user": self.OutputSerializer(user).data,
-            "role_group": self.OutputRoleGroupSerializer(role_group).data,
+            "role_group": self.OutputRoleGroupSerializer(role_group).data if role_group else None,
         }
-        return success("Profile Fetched Successfully", data)
 
 
 # Create your views here.
-class FetchAllUsers(APIView):
+class FetchAllUsers(ConditionalGetMixin, APIView):
+    query_budget = 3
     permission_classes = [IsSuperAdmin]
 
     class OutputSerializer(serializers.ModelSerializer):
@@ -245,7 +298,113 @@ class FetchAllUsers(APIView):
                 "updated_at",
             ]
 
+    paginator = KeysetPaginator()
+
     def get(self, request):
-        users = User.objects.all()
-        serializer = self.OutputSerializer(users, many=True)
-        return success("Fetched All Users", payload=serializer.data)
+        page = self.paginator.paginate(User.objects.all(), request)
+        self.check_not_modified(
+            request, etag=objects_etag(page.objects, page.next_cursor, page.previous_cursor)
+        )
+        serializer = self.OutputSerializer(page.objects, many=True)
+        return success("Fetched All Users", payload=page.payload(serializer.data))
+
+
+class SearchUsers(APIView):
+    """
+    `?q=` over username, email, first and last name: prefix matches first, then similar ones
+    """
+
+    query_budget = 3
+    permission_classes = [IsSuperAdmin]
+
+    class OutputSerializer(FetchAllUsers.OutputSerializer):
+        rank = serializers.FloatField()
+
+        class Meta(FetchAllUsers.OutputSerializer.Meta):
+            fields = FetchAllUsers.OutputSerializer.Meta.fields + ["rank"]
+
+    paginator = RankedKeysetPaginator()
+
+    def get(self, request):
+        query = normalize_query(request.query_params.get("q"))
+        page = self.paginator.paginate(search_users(User.objects.all(), query), request)
+        serializer = self.OutputSerializer(page.objects, many=True)
+        return success("Search Results", payload=page.payload(serializer.data))
+
+
+class ExportUsers(APIView):
+    """
+    Stream every user as NDJSON (default) or CSV, `?output=csv`
+    """
+
+    # No query_budget: the streamed queries run after the middleware has checked the response
+    permission_classes = [IsSuperAdmin]
+
+    fields = FetchAllUsers.OutputSerializer.Meta.fields
+
+    def get(self, request):
+        output = request.query_params.get("output", "ndjson")
+        if output not in STREAM_FORMATS:
+            return error(
+                "Unsupported export format",
+                {"output": f"Expected one of {', '.join(STREAM_FORMATS)}"},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        users = User.objects.order_by("id")
+        return stream_queryset(users, self.fields, output=output, filename="users")
+
+
+# Native async twins of the hottest views, routed instead of the sync ones when
+# settings.ASYNC_VIEWS is on (ASGI deployments, see myapp/asgi.py)
+class AsyncLoginUserView(AsyncAPIView, LoginUserView):
+    @inherit_swagger_schema(LoginUserView.post)
+    async def post(self, request):
+        serializer = self.InputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        username = serializer.validated_data["username"]
+        user = await User.objects.filter(username=username).afirst()
+
+        if not user:
+            return error("User not found", {}, status.HTTP_404_NOT_FOUND)
+
+        # The password hash runs in a worker thread, not on the event loop
+        logged_user = await aauthenticate(
+            request, username=username, password=serializer.validated_data["password"]
+        )
+        if not logged_user:
+            return error("Invalid Credentials", {}, status.HTTP_404_NOT_FOUND)
+
+        await alogin(request, logged_user)
+        logger.info(f"Logged in {logged_user.username}")
+
+        return success("User logged in successfully", self.OutputSerializer(logged_user).data)
+
+
+class AsyncWhoAmIView(AsyncAPIView, WhoAmIView):
+    @inherit_swagger_schema(WhoAmIView.get)
+    async def get(self, request):
+        if not request.user.is_authenticated:
+            return error("User not authenticated", status=HTTP_400_BAD_REQUEST)
+
+        etag, data = await aget_cached_profile(
+            request.user.id, lambda: self.abuild_profile(request.user.id)
+        )
+        self.check_not_modified(request, etag=etag)
+        return success("Profile Fetched Successfully", data)
+
+    async def abuild_profile(self, user_id):
+        user = await User.objects.filter(id=user_id).prefetch_related(*self.profile_prefetch()).afirst()
+        # Serializing reads the prefetched rows, no further queries
+        return self.serialize_profile(user)
+
+
+class AsyncFetchAllUsers(AsyncAPIView, FetchAllUsers):
+    async def get(self, request):
+        page = await self.paginator.apaginate(User.objects.all(), request)
+        self.check_not_modified(
+            request, etag=objects_etag(page.objects, page.next_cursor, page.previous_cursor)
+        )
+        serializer = self.OutputSerializer(page.objects, many=True)
+        return success("Fetched All Users", payload=page.payload(serializer.data))